@@ -1,14 +1,78 @@
 import os
-import boto3
+import io
+import re
+import base64
+import functools
+import hashlib
+import subprocess
 import zipfile
-import tempfile
-from pathlib import Path
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Iterator, List, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
-import uuid
 import time
+import threading
 import cloudrun._infrastructure as _infrastructure
 
+# zlib level 1 deflates several times faster than the default 6 for a few percent
+# larger archives, the upload rather than the size is what run() waits on
+_DEFAULT_COMPRESS_LEVEL = 1
+
+# Compression methods the task image's unzip can extract (it has no LZMA support)
+_SUPPORTED_COMPRESSIONS = frozenset({zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2})
+
+# Formats that are already compressed, deflating them again burns CPU for no
+# size reduction so they are stored as-is
+_PRECOMPRESSED_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp3', '.mp4', '.webm',
+    '.zip', '.whl', '.jar', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.br', '.7z',
+    '.parquet', '.npz',
+})
+
+# Multipart uploads in 8MB parts over 16 parallel connections by default
+_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+_DEFAULT_UPLOAD_CHUNKSIZE = 8 * 1024 * 1024
+_DEFAULT_UPLOAD_CONCURRENCY = 16
+
+# Read size when hashing project files for the archive key
+_DIGEST_CHUNK_SIZE = 1024 * 1024
+
+# Projects smaller than this are zipped in memory and sent with a single PutObject
+_SINGLE_PUT_MAX_SIZE = _MULTIPART_THRESHOLD
+
+# RunTask starts at most this many tasks per call
+_RUN_TASK_MAX_COUNT = 10
+
+# Concurrent RunTask calls issued by run_many()
+_RUN_MANY_MAX_WORKERS = 10
+
+# wait_for_task_completion() first polls after this many seconds, then backs off
+_WAIT_INITIAL_POLL_INTERVAL = 1
+
+# DescribeTasks accepts at most this many tasks per call
+_DESCRIBE_TASKS_MAX_COUNT = 100
+
+# Uploads currently running in this process, keyed by (bucket, key)
+_uploads_in_flight: Dict[Tuple[str, str], Future] = {}
+_uploads_lock = threading.Lock()
+
+# run() options passed through to create_and_upload_zip()
+_UPLOAD_OPTIONS = ('exclude_paths', 'verbose', 'compression', 'compress_level', 'use_gitignore', 'upload_concurrency', 'upload_chunksize')
+
+# run() options that describe the shared upload in run_many(), not individual jobs
+_RUN_MANY_SHARED_OPTIONS = frozenset(_UPLOAD_OPTIONS + ('region', 'run_local'))
+
+# Valid Fargate memory sizes (in MB) for each vCPU count
+_CPU_MEMORY_COMBINATIONS = MappingProxyType({
+    0.25: frozenset([512, 1024, 2048]),
+    0.5: frozenset([1024, 2048, 3072, 4096]),
+    1.0: frozenset([2048, 3072, 4096, 5120, 6144, 7168, 8192]),
+    2.0: frozenset(range(4096, 16385, 1024)),
+    4.0: frozenset(range(8192, 30721, 1024)),
+    8.0: frozenset(range(16384, 61441, 4096)),
+    16.0: frozenset(range(32768, 122881, 8192))
+})
+
 ###############################################################################
 
 def validate_cpu_memory(vcpus: float, memory: int) -> None:
@@ -22,23 +86,13 @@ def validate_cpu_memory(vcpus: float, memory: int) -> None:
     Raises:
         ValueError: If invalid vcpus or memory values are provided
     """
-    cpu_memory_combinations = {
-        0.25: [512, 1024, 2048],
-        0.5: [1024, 2048, 3072, 4096],
-        1.0: [2048, 3072, 4096, 5120, 6144, 7168, 8192],
-        2.0: list(range(4096, 16385, 1024)),
-        4.0: list(range(8192, 30721, 1024)),
-        8.0: list(range(16384, 61441, 4096)),
-        16.0: list(range(32768, 122881, 8192))
-    }
+    if vcpus not in _CPU_MEMORY_COMBINATIONS:
+        raise ValueError(f"vcpus must be one of {list(_CPU_MEMORY_COMBINATIONS.keys())}")
     
-    if vcpus not in cpu_memory_combinations:
-        raise ValueError(f"vcpus must be one of {list(cpu_memory_combinations.keys())}")
-    
-    if memory not in cpu_memory_combinations[vcpus]:
+    if memory not in _CPU_MEMORY_COMBINATIONS[vcpus]:
         raise ValueError(
             f"For {vcpus} vCPUs, memory must be one of these values (in MB): "
-            f"{cpu_memory_combinations[vcpus]}"
+            f"{sorted(_CPU_MEMORY_COMBINATIONS[vcpus])}"
         )
 
 ###############################################################################
@@ -76,54 +130,319 @@ def _run_local(script_path: str, method_name: Optional[str], params: Optional[Di
 
 ###############################################################################
 
-def create_and_upload_zip(region, script_path: str, exclude_paths: Optional[list[str]], verbose: bool) -> str:
+@functools.lru_cache(maxsize=None)
+def _get_transfer_config(max_concurrency: int, chunksize: int):
+    """Get an S3 TransferConfig, importing boto3's transfer module on first use."""
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(
+        multipart_threshold=_MULTIPART_THRESHOLD,
+        multipart_chunksize=chunksize,
+        max_concurrency=max_concurrency,
+        use_threads=True
+    )
+
+###############################################################################
+
+def _compile_excludes(excludes: set) -> re.Pattern:
+    """
+    Compiles exclude patterns into a single regex matching any of them as a substring.
+    
+    Patterns may use the glob wildcards * and ?, which never match across a '/'.
+    A pattern with wildcards must also match up to the end of a path component,
+    so '*.pyc' excludes 'mod.pyc' but not 'mod.pyc.txt'.
+    
+    Args:
+        excludes: Path patterns to exclude
+    
+    Returns:
+        re.Pattern: Compiled pattern (never matches when there are no excludes)
+    """
+    alternatives = []
+    for pattern in sorted(excludes):
+        regex = re.escape(pattern)
+        if '*' in pattern or '?' in pattern:
+            regex = regex.replace(r'\*', '[^/]*').replace(r'\?', '[^/]') + '(?![^/])'
+        alternatives.append(regex)
+    return re.compile('|'.join(alternatives) or '(?!)')
+
+###############################################################################
+
+def _iter_files(root: str, excludes: set) -> Iterator[Tuple[str, str]]:
+    """
+    Walks a directory tree with os.scandir, yielding the files to package.
+    
+    Directories matching an exclude pattern are pruned instead of being walked
+    and filtered file by file.
+    
+    Args:
+        root: Directory to walk
+        excludes: Path patterns to exclude
+    
+    Yields:
+        Tuple[str, str]: (file_path, arcname) for each included file
+    """
+    # One regex search per entry instead of a Python-level scan over every pattern
+    is_excluded = _compile_excludes(excludes).search
+
+    # Every path scandir yields starts with this prefix, so arcnames are a slice
+    # instead of a per-file os.path.relpath() (which re-normalizes both paths)
+    prefix_length = len(os.path.join(root, ''))
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not is_excluded(entry.path + '/'):
+                        stack.append(entry.path)
+                elif entry.is_file() and entry.name != 'temp.zip':
+                    if not is_excluded(entry.path):
+                        yield entry.path, entry.path[prefix_length:]
+
+###############################################################################
+
+def _list_git_files(excludes: set) -> Optional[List[Tuple[str, str]]]:
+    """
+    Lists the files git considers part of the current directory's project.
+    
+    Tracked files and untracked files that aren't gitignored are read from git's
+    index, so ignored trees like node_modules/ or build outputs are never walked.
+    
+    Args:
+        excludes: Path patterns to exclude
+    
+    Returns:
+        Optional[List[Tuple[str, str]]]: (file_path, arcname) for each included file,
+            or None if the current directory isn't in a git work tree
+    """
+    try:
+        output = subprocess.run(
+            ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+            check=True, capture_output=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    is_excluded = _compile_excludes(excludes).search
+    files = []
+    for name in output.split(b'\0'):
+        if not name:
+            continue
+        arcname = os.fsdecode(name)
+        file_path = os.path.join('.', arcname)
+        # Tracked files deleted from the work tree are still in the index
+        if not is_excluded(file_path) and os.path.isfile(file_path):
+            files.append((file_path, arcname))
+    return files
+
+###############################################################################
+
+def _write_zip(stream, files: List[Tuple[str, str]], compression: int, compresslevel: Optional[int], verbose: bool) -> None:
+    """
+    Write a zip of the given files to a (possibly unseekable) stream.
+    
+    Files with an already-compressed extension are stored rather than deflated.
+    """
+    with zipfile.ZipFile(stream, 'w', compression, compresslevel=compresslevel) as zipf:
+        for file_path, arcname in files:
+            if os.path.splitext(arcname)[1].lower() in _PRECOMPRESSED_EXTENSIONS:
+                zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+            else:
+                zipf.write(file_path, arcname)
+            if verbose:
+                # zipf.write() already stat'ed the file, reuse its size
+                print(f"Added {file_path} to zip file {zipf.filelist[-1].file_size}")
+
+###############################################################################
+
+def _archive_digest(files: List[Tuple[str, str]], compression: int, compresslevel: Optional[int]) -> Tuple[str, int]:
+    """
+    Hashes the file names and contents that determine the archive.
+    
+    Contents are read rather than trusting size and mtime, since cp -p, rsync -a,
+    tar -x and artifact restores can swap in a same-size file with the old mtime.
+    The second read when zipping is then served from the page cache.
+    
+    Args:
+        files: (file_path, arcname) tuples that will be archived
+        compression: zipfile compression method
+        compresslevel: zipfile compression level
+    
+    Returns:
+        Tuple[str, int]: Hex digest identifying the archive, and the total size of the files
+    """
+    digest = hashlib.sha256(f"{compression}:{compresslevel}".encode('utf-8'))
+    total_size = 0
+    for file_path, arcname in files:
+        file_digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(functools.partial(f.read, _DIGEST_CHUNK_SIZE), b''):
+                file_digest.update(chunk)
+                total_size += len(chunk)
+        digest.update(f"\0{arcname}\0".encode('utf-8'))
+        digest.update(file_digest.digest())
+    return digest.hexdigest(), total_size
+
+###############################################################################
+
+def _s3_object_exists(s3, bucket_name: str, s3_key: str) -> bool:
+    """Check whether an object exists with a single HEAD request."""
+    from botocore.exceptions import ClientError
+    try:
+        s3.head_object(Bucket=bucket_name, Key=s3_key)
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+
+###############################################################################
+
+def _upload_zip(
+    s3,
+    bucket_name: str,
+    s3_key: str,
+    files: List[Tuple[str, str]],
+    total_size: int,
+    compression: int,
+    compresslevel: Optional[int],
+    transfer_config,
+    verbose: bool
+) -> None:
+    """Zips the files and uploads the archive unless it is already in the bucket."""
+    if _s3_object_exists(s3, bucket_name, s3_key):
+        if verbose:
+            print(f"Project unchanged, reusing s3://{bucket_name}/{s3_key}")
+        return
+
+    if total_size < _SINGLE_PUT_MAX_SIZE:
+        # A small archive is one PUT either way, building it in memory skips the
+        # transfer manager's thread pool and the pipe/writer thread
+        buffer = io.BytesIO()
+        _write_zip(buffer, files, compression, compresslevel, verbose)
+        body = buffer.getvalue()
+        s3.put_object(
+            Bucket=bucket_name,
+            Key=s3_key,
+            Body=body,
+            ContentMD5=base64.b64encode(hashlib.md5(body).digest()).decode('ascii')
+        )
+        return
+
+    # The zip is written into a pipe by a background thread while upload_fileobj
+    # reads the other end, so compression overlaps the multipart upload and the
+    # archive is never held in memory or on disk as a whole
+    def write_to_pipe(stream):
+        with stream:
+            _write_zip(stream, files, compression, compresslevel, verbose)
+
+    read_fd, write_fd = os.pipe()
+    with open(read_fd, 'rb') as reader, ThreadPoolExecutor(max_workers=1) as executor:
+        writer = executor.submit(write_to_pipe, open(write_fd, 'wb'))
+        try:
+            s3.upload_fileobj(reader, bucket_name, s3_key, Config=transfer_config)
+        finally:
+            # Unblocks the writer with a broken pipe if the upload gave up early
+            reader.close()
+        try:
+            writer.result()
+        except Exception:
+            # The upload saw a truncated archive, don't leave it behind
+            s3.delete_object(Bucket=bucket_name, Key=s3_key)
+            raise
+
+###############################################################################
+
+def create_and_upload_zip(
+    region,
+    *,
+    exclude_paths: Optional[list[str]] = None,
+    verbose: bool = False,
+    compression: int = zipfile.ZIP_DEFLATED,
+    compress_level: int = _DEFAULT_COMPRESS_LEVEL,
+    use_gitignore: bool = False,
+    upload_concurrency: int = _DEFAULT_UPLOAD_CONCURRENCY,
+    upload_chunksize: int = _DEFAULT_UPLOAD_CHUNKSIZE
+) -> str:
     """
     Creates a zip file of the project and uploads it to S3.
     
     Args:
-        script_path: Path to the script being run
+        region: AWS region of the bucket
         exclude_paths: Optional list of paths to exclude
         verbose: Whether to print verbose output
+        compression: zipfile compression method (ZIP_STORED, ZIP_DEFLATED or ZIP_BZIP2)
+        compress_level: Compression level for ZIP_DEFLATED and ZIP_BZIP2, 0 stores files uncompressed
+        use_gitignore: Take the file list from git, leaving out gitignored files (falls back to
+            walking the directory outside a git work tree)
+        upload_concurrency: Number of multipart upload parts sent in parallel
+        upload_chunksize: Size in bytes of each multipart upload part
     
     Returns:
         str: S3 key where the zip was uploaded
+    
+    Raises:
+        ValueError: If the task image can't extract the compression method
     """
+    if compression not in _SUPPORTED_COMPRESSIONS:
+        raise ValueError(f"Unsupported compression method {compression}, use ZIP_STORED, ZIP_DEFLATED or ZIP_BZIP2")
+
     default_excludes = {'.venv/', 'venv/', '__pycache__/', '*.pyc', ".git/"}
     if exclude_paths:
         default_excludes.update(exclude_paths)
 
-    with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp:
-        zip_path = Path(tmp.name)
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, _, files in os.walk('.'):
-            if any(pattern in root for pattern in default_excludes):
-                continue
-                
-            for file in files:
-                if file != 'temp.zip':
-                    file_path = os.path.join(root, file)
-                    if any(pattern in file_path for pattern in default_excludes):
-                        continue
-                    arcname = os.path.relpath(file_path, '.')
-                    zipf.write(file_path, arcname)
-                    if verbose:
-                        size = os.path.getsize(file_path)
-                        print(f"Added {file_path} to zip file {size}")
-    
-    s3_key = f"jobs/{os.path.basename(script_path)}/{zip_path.name}"
-    s3 = boto3.client('s3', region_name=region)
-    s3.upload_file(str(zip_path), _infrastructure.get_bucket_name(region), s3_key)
-    
-    zip_path.unlink()
+    if compress_level == 0:
+        compression = zipfile.ZIP_STORED
+    compresslevel = compress_level if compression in (zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2) else None
+
+    # Archives are keyed by their contents, so resubmitting an unchanged project
+    # costs a HEAD request instead of an upload
+    files = _list_git_files(default_excludes) if use_gitignore else None
+    if files is None:
+        files = _iter_files('.', default_excludes)
+    files = sorted(files, key=lambda file: file[1])
+    digest, total_size = _archive_digest(files, compression, compresslevel)
+    s3_key = f"jobs/{digest}.zip"
+    bucket_name = _infrastructure.get_bucket_name(region)
+    s3 = _infrastructure.get_client('s3', region)
+
+    # Concurrent submissions of the same project (e.g. run_async() calls gathered
+    # together) wait for a single upload instead of each uploading the archive
+    upload_key = (bucket_name, s3_key)
+    with _uploads_lock:
+        upload = _uploads_in_flight.get(upload_key)
+        owns_upload = upload is None
+        if owns_upload:
+            upload = _uploads_in_flight[upload_key] = Future()
+    if not owns_upload:
+        upload.result()
+        return s3_key
+
+    try:
+        _upload_zip(
+            s3, bucket_name, s3_key, files, total_size, compression, compresslevel,
+            _get_transfer_config(upload_concurrency, upload_chunksize), verbose
+        )
+        upload.set_result(None)
+    except BaseException as e:
+        upload.set_exception(e)
+        raise
+    finally:
+        with _uploads_lock:
+            del _uploads_in_flight[upload_key]
+
     return s3_key
 
 ###############################################################################
 
+@functools.lru_cache(maxsize=None)
 def get_default_vpc_and_subnet(region: str) -> tuple:
-    """Get VPC and subnet information, either from provided values or default."""
+    """Get VPC and subnet information, either from provided values or default.
+    
+    The default VPC doesn't change during a process, so it is looked up once per region.
+    """
     print("\nGetting VPC and subnet information...")
     
-    ec2_client = boto3.client('ec2', region_name=region)
+    ec2_client = _infrastructure.get_client('ec2', region)
     vpcs = ec2_client.describe_vpcs(
         Filters=[{'Name': 'isDefault', 'Values': ['true']}]
     )['Vpcs']
@@ -148,6 +467,109 @@ def get_default_vpc_and_subnet(region: str) -> tuple:
 
 ###############################################################################
 
+class TaskStartError(RuntimeError):
+    """
+    ECS could not start all of the requested tasks.
+    
+    Attributes:
+        task_ids: AWS ECS Task IDs of the tasks that did start, and are running
+    """
+
+    def __init__(self, message: str, task_ids: List[str]):
+        super().__init__(message)
+        self.task_ids = task_ids
+
+###############################################################################
+
+class _PendingTask:
+    """A task waiting in _TaskBatcher for its RunTask call."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.promoted = False
+        self.task_id = None
+        self.error = None
+
+###############################################################################
+
+class _TaskBatcher:
+    """
+    Coalesces concurrent requests for identical tasks into RunTask calls with a count.
+    
+    The first caller for a key starts its task straight away. Callers arriving
+    while that RunTask is in flight queue up and are started together by the
+    next call, so a lone run() waits for nothing and a burst of identical
+    run_async() calls costs one RunTask per 10 tasks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues: Dict[Any, List[_PendingTask]] = {}
+        self._starting = set()
+
+    def submit(self, key, start) -> str:
+        """
+        Starts one task, batched with concurrent submissions under the same key.
+        
+        Args:
+            key: Hashable identity of the task, equal keys must start identical tasks
+            start: Callable taking a count and returning that many task IDs
+        
+        Returns:
+            str: AWS ECS Task ID
+        """
+        pending = _PendingTask()
+        with self._lock:
+            self._queues.setdefault(key, []).append(pending)
+            leads = key not in self._starting
+            if leads:
+                self._starting.add(key)
+
+        if not leads:
+            pending.event.wait()
+            if pending.promoted:
+                pending.event.clear()
+        if leads or pending.promoted:
+            self._start_next_batch(key, start)
+            pending.event.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.task_id
+
+    def _start_next_batch(self, key, start) -> None:
+        """Starts the queued tasks for a key, then hands over to the next caller in line."""
+        with self._lock:
+            queue = self._queues[key]
+            batch, queue[:] = queue[:_RUN_TASK_MAX_COUNT], queue[_RUN_TASK_MAX_COUNT:]
+
+        task_ids = [None] * len(batch)
+        try:
+            task_ids = start(len(batch))
+        except BaseException as e:
+            # Includes KeyboardInterrupt during the IAM retry backoff, the waiters
+            # must still be released or later submissions for the key hang
+            for pending in batch:
+                pending.error = e
+            raise
+        finally:
+            with self._lock:
+                if queue:
+                    # The caller at the head of the queue starts the next batch, so no
+                    # thread keeps working on behalf of others after its task started
+                    queue[0].promoted = True
+                    queue[0].event.set()
+                else:
+                    del self._queues[key]
+                    self._starting.discard(key)
+
+            for pending, task_id in zip(batch, task_ids):
+                pending.task_id = task_id
+                pending.event.set()
+
+_task_batcher = _TaskBatcher()
+
+###############################################################################
 
 def run_ecs_task(
     script_path: str,
@@ -171,6 +593,38 @@ def run_ecs_task(
     Returns:
         str: AWS ECS Task ID
     """
+    # Identical tasks submitted concurrently (e.g. through run_async) share a RunTask call
+    key = (script_path, method_name, s3_key, json.dumps(kwargs, sort_keys=True, default=str))
+    return _task_batcher.submit(
+        key,
+        lambda count: run_ecs_tasks(script_path, method_name, s3_key, count, **kwargs)
+    )
+
+###############################################################################
+
+def run_ecs_tasks(
+    script_path: str,
+    method_name: str,
+    s3_key: str,
+    count: int,
+    **kwargs
+) -> List[str]:
+    """
+    Runs identical tasks on ECS Fargate with a single RunTask call.
+    
+    Args:
+        script_path: Path to the script
+        method_name: Optional method name to call
+        s3_key: S3 key where the zip file is stored
+        count: Number of tasks to start (1 to 10, RunTask's limit)
+        **kwargs: Same task options as run_ecs_task()
+    
+    Returns:
+        List[str]: AWS ECS Task IDs
+    
+    Raises:
+        TaskStartError: If ECS could not start all of the tasks
+    """
 
     region = kwargs.get('region', 'us-east-1')
     bucket_name = _infrastructure.get_bucket_name(region)
@@ -182,7 +636,6 @@ def run_ecs_task(
     else:
         _, subnet_id = get_default_vpc_and_subnet(region)
 
-    task_definition_arn = _infrastructure.get_task_definition_arn(region)
     vcpus = kwargs.get('vcpus', 0.25)
     cpu_units = str(int(vcpus * 1024))
     memory = kwargs.get('memory', 512)
@@ -193,7 +646,10 @@ def run_ecs_task(
 
     task_params = {
         'cluster': _infrastructure.get_cluster_name(),
-        'taskDefinition': task_definition_arn,
+        # The family name resolves to the latest active revision, same as the
+        # revisionless ARN, without needing the account ID
+        'taskDefinition': _infrastructure.get_task_family(),
+        'count': count,
         'networkConfiguration': {
             'awsvpcConfiguration': {
                 'subnets': [subnet_id],
@@ -204,7 +660,7 @@ def run_ecs_task(
             'cpu': cpu_units,
             'memory': str(memory),
             'containerOverrides': [{
-                'name': 'cloudrun-executor',
+                'name': _infrastructure.get_container_name(),
                 'command': command,
             }]
         }
@@ -219,88 +675,324 @@ def run_ecs_task(
     else:
         task_params['launchType'] = 'FARGATE'
     
-    ecs = boto3.client('ecs', region_name=region)
-    task = ecs.run_task(**task_params)
+    ecs = _infrastructure.get_client('ecs', region)
+    response = _infrastructure.call_with_iam_retry(ecs.run_task, **task_params)
+    
+    # Return the actual AWS task IDs
+    task_ids = [task['taskArn'].split('/')[-1] for task in response['tasks']]
+    if response.get('failures'):
+        reasons = ", ".join(failure.get('reason', 'Unknown') for failure in response['failures'])
+        raise TaskStartError(f"Failed to start {len(response['failures'])} of {count} tasks ({reasons}), started: {task_ids}", task_ids)
+    return task_ids
+
+###############################################################################
+
+def _gather_started_tasks(futures: List[Future]) -> List[List[str]]:
+    """
+    Waits for every run_ecs_tasks() call and returns the task IDs each one started.
+    
+    A failed call doesn't hide the tasks the others started, they are reported
+    together once all calls have finished.
+    
+    Args:
+        futures: Futures of run_ecs_tasks() calls
+    
+    Returns:
+        List[List[str]]: Task IDs started by each call, in the order of futures
+    
+    Raises:
+        TaskStartError: If any call failed, with every task ID that was started
+        Exception: The first call's own error if every call failed before starting a task
+    """
+    results, errors = [], []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except TaskStartError as e:
+            results.append(e.task_ids)
+            errors.append(e)
+        except Exception as e:
+            results.append([])
+            errors.append(e)
+
+    if errors:
+        started = [task_id for task_ids in results for task_id in task_ids]
+        if not started and not any(isinstance(error, TaskStartError) for error in errors):
+            # Nothing is running, so the original error says more than a wrapper
+            raise errors[0]
+        raise TaskStartError(f"{len(errors)} of {len(futures)} RunTask calls failed ({errors[0]}), started: {started}", started) from errors[0]
+    return results
+
+###############################################################################
+
+def _parse_script_path(script_path: str) -> Tuple[str, str]:
+    """
+    Splits a module.method path into the module's file and the method name.
+    
+    Args:
+        script_path: module.method to run (e.g. "main.hello_world")
     
-    # Return the actual AWS task ID
-    return task['tasks'][0]['taskArn'].split('/')[-1]
+    Returns:
+        Tuple[str, str]: (path to the module's .py file, method name)
+    
+    Raises:
+        ValueError: If script_path is not a module.method
+        FileNotFoundError: If the module's file doesn't exist
+    """
+    module_path, separator, method_name = script_path.rpartition('.')
+    # A file path like "./jobs/train.py" would otherwise parse as method "py"
+    if not separator or method_name == 'py' or not method_name.isidentifier():
+        raise ValueError(f"Script path must be a module.method (e.g. 'main.my_method'), got '{script_path}'")
+
+    script_path = module_path + '.py'
+    if not os.path.exists(script_path):
+        raise FileNotFoundError(f"Module not found: {script_path}")
+
+    return script_path, method_name
+
+###############################################################################
+
+def _get_upload_options(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Picks the create_and_upload_zip() options out of run()'s keyword arguments."""
+    return {option: kwargs[option] for option in _UPLOAD_OPTIONS if option in kwargs}
 
 ###############################################################################
 
 def run(
     script_path: str, 
+    count: int = 1,
     **kwargs
-) -> str:
+) -> Union[str, List[str]]:
     """
     Run a Python script or method in the cloud or locally.
     
     Args:
         script_path: Path to the Python script or module.method to run (e.g. "main.hello_world")
+        count: Number of identical tasks to start from the one upload (default: 1). They are
+            started by RunTask calls of up to 10 tasks each, issued in parallel
         vcpus: Number of vCPUs to allocate (default: 0.25). Must be one of [0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0]
         memory: Memory in MB to allocate (default: 512). Must follow Fargate's valid CPU/memory combinations
         use_spot: Whether to use spot instances (default: False)
         exclude_paths: List of path patterns to exclude from the zip file (default: None)
+        use_gitignore: Only package files git tracks or doesn't ignore, skipping the directory walk
+            (default: False). Note that gitignored files such as .env are then left out
         verbose: Whether to print verbose output (default: False)
+        compression: zipfile compression method for the uploaded project (default: zipfile.ZIP_DEFLATED).
+            Use zipfile.ZIP_STORED to skip compression when upload bandwidth is not the bottleneck.
+            ZIP_LZMA is not supported, the task image extracts with unzip
+        compress_level: Compression level for the uploaded project (default: 1, fastest).
+            Higher levels trade CPU time for smaller uploads, 0 stores files uncompressed
+        upload_concurrency: Number of multipart upload parts sent in parallel (default: 16)
+        upload_chunksize: Size in bytes of each multipart upload part (default: 8MB)
         params: Dictionary of parameters to pass to the method (default: None)
         run_local: Whether to run the script locally instead of in the cloud (default: False)
     
     Returns:
-        str: Job ID for tracking the execution (or 'local' if run_local is True)
+        Union[str, List[str]]: Job ID for tracking the execution (or 'local' if run_local is True),
+            or a list of job IDs when count is greater than 1
     
     Raises:
         RuntimeError: If CloudRun hasn't been initialized and run_local is False
-        ValueError: If invalid vcpus or memory values are provided
+        TaskStartError: If ECS could not start some of the tasks, with the IDs of those it started
+        ValueError: If invalid vcpus, memory or count values are provided
     """
     
     # _infrastructure.create_infrastructure(**kwargs)
 
-    # Parse script path to determine if it's a module.method
-    if not '.' in script_path:
-        raise ValueError("Script path must be a module.method (e.g. 'main.my_method')")
+    if count < 1:
+        raise ValueError(f"count must be at least 1, got {count}")
 
-    module_path, method_name = script_path.rsplit('.', 1)
-    script_path = f"{module_path}.py"
-    if not os.path.exists(script_path):
-        raise FileNotFoundError(f"Module not found: {script_path}")
+    script_path, method_name = _parse_script_path(script_path)
 
     run_local = kwargs.get('run_local', False)
     if run_local:
+        if count != 1:
+            raise ValueError("count is not supported with run_local")
         return _run_local(script_path, method_name, kwargs)
 
-    exclude_paths = kwargs.get('exclude_paths', None)
-    verbose = kwargs.get('verbose', False)
+    # Fail on a bad size before uploading, not from inside a RunTask worker
+    validate_cpu_memory(kwargs.get('vcpus', 0.25), kwargs.get('memory', 512))
+
+    region = kwargs.get('region', 'us-east-1')
+
+    # Look up the default subnet and warm the ECS client while the project uploads.
+    # Both are cached, and a failed lookup is simply retried by run_ecs_task().
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        if not (kwargs.get('vpc_id') and kwargs.get('subnet_id')):
+            executor.submit(get_default_vpc_and_subnet, region)
+        executor.submit(_infrastructure.get_client, 'ecs', region)
+        s3_key = create_and_upload_zip(region, **_get_upload_options(kwargs))
+    if count == 1:
+        return run_ecs_task(script_path, method_name, s3_key, **kwargs)
+
+    batch_sizes = [min(_RUN_TASK_MAX_COUNT, count - start) for start in range(0, count, _RUN_TASK_MAX_COUNT)]
+    with ThreadPoolExecutor(max_workers=min(_RUN_MANY_MAX_WORKERS, len(batch_sizes))) as executor:
+        futures = [
+            executor.submit(run_ecs_tasks, script_path, method_name, s3_key, batch_size, **kwargs)
+            for batch_size in batch_sizes
+        ]
+    return [task_id for task_ids in _gather_started_tasks(futures) for task_id in task_ids]
+
+###############################################################################
+
+def run_many(
+    jobs: List[Union[str, Dict[str, Any]]],
+    max_concurrency: int = _RUN_MANY_MAX_WORKERS,
+    **kwargs
+) -> List[str]:
+    """
+    Run several methods from the current project in the cloud.
+    
+    The project is zipped and uploaded once for all of them. Identical jobs are
+    started together by a single RunTask call (up to 10 tasks each), and the
+    RunTask calls themselves are issued in parallel.
+    
+    Args:
+        jobs: Jobs to run, each either a module.method path (e.g. "main.train") or a
+            dict with a 'script_path' and per-job task options (e.g. params, vcpus, memory)
+        max_concurrency: Maximum number of RunTask calls in flight (default: 10)
+        **kwargs: Same keyword arguments as run(), applied to every job unless the job
+            overrides them. region and the upload options (exclude_paths, use_gitignore, verbose,
+            compression, compress_level, upload_concurrency and upload_chunksize) apply to
+            the shared upload and can't be set per job (run_local and count are not supported,
+            repeat a job instead of passing count)
+    
+    Returns:
+        List[str]: AWS ECS Task IDs, in the same order as jobs
+    
+    Raises:
+        TaskStartError: If ECS could not start some of the tasks, with the IDs of those it started
+        ValueError: If invalid vcpus or memory values, per-job upload options, count or
+            run_local are provided, or a dict job has no script_path
+    """
+    if not jobs:
+        return []
+    if 'count' in kwargs:
+        raise ValueError("count is not supported by run_many(), repeat the job in jobs instead")
+    if kwargs.get('run_local'):
+        raise ValueError("run_local is not supported by run_many(), call run() for each job instead")
+
     region = kwargs.get('region', 'us-east-1')
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        # Look up the default subnet and warm the ECS client while the project uploads
+        if not (kwargs.get('vpc_id') and kwargs.get('subnet_id')):
+            network_future = executor.submit(get_default_vpc_and_subnet, region)
+        else:
+            network_future = None
+        executor.submit(_infrastructure.get_client, 'ecs', region)
+
+        # Group identical jobs, remembering where each one goes in the result
+        groups = {}
+        for index, job in enumerate(jobs):
+            job_kwargs = dict(kwargs)
+            if isinstance(job, str):
+                script_path = job
+            else:
+                shared_options = _RUN_MANY_SHARED_OPTIONS.intersection(job)
+                if shared_options:
+                    raise ValueError(f"{', '.join(sorted(shared_options))} can't be set per job, pass them to run_many() instead")
+                if 'script_path' not in job:
+                    raise ValueError(f"Job {index} has no 'script_path', dict jobs need the module.method to run")
+                if 'count' in job:
+                    raise ValueError("count can't be set per job, repeat the job in jobs instead")
+                job_kwargs.update(job)
+                script_path = job_kwargs.pop('script_path')
+
+            script_path, method_name = _parse_script_path(script_path)
+            key = (script_path, method_name, json.dumps(job_kwargs, sort_keys=True, default=str))
+            if key not in groups:
+                validate_cpu_memory(job_kwargs.get('vcpus', 0.25), job_kwargs.get('memory', 512))
+                groups[key] = (job_kwargs, [])
+            groups[key][1].append(index)
 
-    s3_key = create_and_upload_zip(region, script_path, exclude_paths, verbose)
-    return run_ecs_task(script_path, method_name, s3_key, **kwargs)
+        s3_key = create_and_upload_zip(region, **_get_upload_options(kwargs))
+        default_network = network_future.result() if network_future else None
+
+        batches = []
+        for (script_path, method_name, _), (job_kwargs, indices) in groups.items():
+            if default_network and not (job_kwargs.get('vpc_id') and job_kwargs.get('subnet_id')):
+                job_kwargs = dict(job_kwargs, vpc_id=default_network[0], subnet_id=default_network[1])
+            for start in range(0, len(indices), _RUN_TASK_MAX_COUNT):
+                batch = indices[start:start + _RUN_TASK_MAX_COUNT]
+                future = executor.submit(run_ecs_tasks, script_path, method_name, s3_key, len(batch), **job_kwargs)
+                batches.append((batch, future))
+
+    task_ids = [None] * len(jobs)
+    started = _gather_started_tasks([future for _, future in batches])
+    for (batch, _), batch_task_ids in zip(batches, started):
+        for index, task_id in zip(batch, batch_task_ids):
+            task_ids[index] = task_id
+    return task_ids
+
+###############################################################################
+
+async def run_async(
+    script_path: str,
+    **kwargs
+) -> Union[str, List[str]]:
+    """
+    Asynchronous version of run().
+    
+    The zip, upload and task submission run on a worker thread, so several jobs
+    can be submitted concurrently with asyncio.gather().
+    
+    Args:
+        script_path: Path to the Python script or module.method to run (e.g. "main.hello_world")
+        **kwargs: Same keyword arguments as run()
+    
+    Returns:
+        Union[str, List[str]]: Job ID for tracking the execution (or 'local' if run_local is True),
+            or a list of job IDs when count is greater than 1
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(run, script_path, **kwargs))
 
 ###############################################################################
 
-def wait_for_task_completion(task_id: str, region: str = 'us-east-1', poll_interval: int = 10) -> None:
+def wait_for_task_completion(
+    task_id: Union[str, List[str]],
+    region: str = 'us-east-1',
+    poll_interval: int = 10
+) -> None:
     """
-    Wait for a task to complete by polling its status.
+    Wait for one or more tasks to complete by polling their status.
+    
+    Polling starts after a second and backs off exponentially up to poll_interval,
+    so short tasks are noticed quickly without polling long ones more often.
+    All tasks are checked together with one DescribeTasks call per 100 tasks.
     
     Args:
-        task_id: The ID of the task to wait for
-        env_name: Name of the environment to use (default: 'default')
-        poll_interval: How often to check task status in seconds (default: 10)
+        task_id: The ID of the task to wait for, or a list of task IDs
+        region: AWS region the tasks run in (default: 'us-east-1')
+        poll_interval: Longest time between status checks in seconds (default: 10)
     
     Raises:
-        RuntimeError: If the task fails or is stopped
+        RuntimeError: If a task fails, is stopped or can't be found
     """
-    ecs = boto3.client('ecs', region_name=region)
+    ecs = _infrastructure.get_client('ecs', region)
     cluster_name = _infrastructure.get_cluster_name()
+    pending = [task_id] if isinstance(task_id, str) else list(task_id)
+    delay = min(_WAIT_INITIAL_POLL_INTERVAL, poll_interval)
     
-    while True:
-        response = ecs.describe_tasks(cluster=cluster_name, tasks=[task_id])
-        task = response['tasks'][0]
-        
-        if task['lastStatus'] == 'STOPPED':
-            if task['stopCode'] != 'EssentialContainerExited':
-                raise RuntimeError(f"Task failed with stop code: {task['stopCode']}")
-            return
-            
-        time.sleep(poll_interval)
+    while pending:
+        still_running = []
+        for i in range(0, len(pending), _DESCRIBE_TASKS_MAX_COUNT):
+            response = ecs.describe_tasks(cluster=cluster_name, tasks=pending[i:i + _DESCRIBE_TASKS_MAX_COUNT])
+            if response.get('failures'):
+                failure = response['failures'][0]
+                raise RuntimeError(f"Could not describe task {failure.get('arn')}: {failure.get('reason')}")
+
+            for task in response['tasks']:
+                if task['lastStatus'] != 'STOPPED':
+                    still_running.append(task['taskArn'].split('/')[-1])
+                elif task['stopCode'] != 'EssentialContainerExited':
+                    raise RuntimeError(f"Task failed with stop code: {task['stopCode']}")
+
+        pending = still_running
+        if pending:
+            time.sleep(delay)
+            delay = min(delay * 2, poll_interval)
 
 ###############################################################################
 
@@ -308,7 +1000,10 @@ __all__ = [
     # Configuration functions
     # Task functions
     'run',
+    'run_async',
+    'run_many',
     'wait_for_task_completion',
+    'TaskStartError',
     # CLI functions
     'get_tasks',
     'delete_task'
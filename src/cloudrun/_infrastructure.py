@@ -1,10 +1,98 @@
 import os
-import boto3
+import base64
 import json
+import functools
+import hashlib
+import random
+import time
 from typing import Dict, Any
 import subprocess
 import shutil
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by every client: a larger keep-alive pool so concurrent S3/ECS/ECR
+# calls don't queue on connections, and adaptive retries for IAM/ECR throttling.
+_CLIENT_CONFIG_OPTIONS = {
+    'max_pool_connections': 50,
+    'tcp_keepalive': True,
+    'retries': {'max_attempts': 10, 'mode': 'adaptive'}
+}
+
+# Concurrent delete calls per resource type in destroy_infrastructure()
+_DESTROY_MAX_WORKERS = 10
+
+# Serializes client creation on the shared session
+_CLIENT_LOCK = threading.Lock()
+
+# Package files copied into the executor image
+_PACKAGE_FILES = ['__init__.py', 'cli.py', '_infrastructure.py']
+
+# Tag applied to every resource CloudRun creates, used to find them in a single lookup
+_RESOURCE_TAG_KEY = 'app'
+_RESOURCE_TAG_VALUE = 'cloudrun'
+
+# Error codes AWS services use for a missing IAM permission
+_ACCESS_DENIED_ERROR_CODES = frozenset({'AccessDenied', 'AccessDeniedException'})
+
+# Error codes ECS returns while a freshly created IAM role is still propagating
+_IAM_PROPAGATION_ERROR_CODES = frozenset({'InvalidParameterException'})
+_IAM_RETRY_MAX_ATTEMPTS = 8
+_IAM_RETRY_BASE_DELAY = 0.5
+
+# Task definition tag recording the inputs of the last successful create_infrastructure()
+_FINGERPRINT_TAG = 'cloudrun:fingerprint'
+
+###############################################################################
+
+@functools.lru_cache(maxsize=1)
+def _get_session():
+    """Get the boto3 session every client is created from."""
+    # boto3 takes a few hundred ms to import, only pay for it once AWS is needed
+    import boto3
+    return boto3.session.Session()
+
+###############################################################################
+
+@functools.lru_cache(maxsize=32)
+def _create_client(service: str, region: str):
+    """Create a boto3 client, callers must hold _CLIENT_LOCK."""
+    from botocore.config import Config
+    return _get_session().client(service, region_name=region, config=Config(**_CLIENT_CONFIG_OPTIONS))
+
+###############################################################################
+
+def get_client(service: str, region: str):
+    """Get a boto3 client for a service and region, shared across the process."""
+    # Sessions aren't thread-safe, and the thread pools in create_infrastructure()
+    # and run_many() ask for clients concurrently. Clients themselves are.
+    with _CLIENT_LOCK:
+        return _create_client(service, region)
+
+###############################################################################
+
+def call_with_iam_retry(fn, *args, **kwargs):
+    """Call an ECS API that depends on an IAM role, retrying while the role propagates."""
+    from botocore.exceptions import ClientError
+    for attempt in range(_IAM_RETRY_MAX_ATTEMPTS):
+        try:
+            return fn(*args, **kwargs)
+        except ClientError as e:
+            error = e.response.get('Error', {})
+            # ECS reports an unassumable role as a generic InvalidParameterException,
+            # only retry those when the message is actually about the role
+            if (error.get('Code') not in _IAM_PROPAGATION_ERROR_CODES
+                    or 'role' not in error.get('Message', '').lower()
+                    or attempt == _IAM_RETRY_MAX_ATTEMPTS - 1):
+                raise
+            time.sleep(_IAM_RETRY_BASE_DELAY * 2 ** attempt + random.random())
+
+###############################################################################
+
+def _is_access_denied(error) -> bool:
+    """Check whether a botocore ClientError is a missing IAM permission."""
+    return error.response.get('Error', {}).get('Code') in _ACCESS_DENIED_ERROR_CODES
 
 ###############################################################################
 
@@ -22,9 +110,8 @@ def get_log_group() -> str:
 
 def get_task_definition_arn(region: str) -> str:
     """Get the task definition ARN for the environment."""
-    sts_client = boto3.client('sts', region_name=region)
-    account_id = get_account_id(sts_client)
-    return f"arn:aws:ecs:{region}:{account_id}:task-definition/cloudrun-task"
+    account_id = _get_cached_account_id(region)
+    return f"arn:aws:ecs:{region}:{account_id}:task-definition/{get_task_family()}"
 
 ###############################################################################
 
@@ -34,9 +121,9 @@ def get_ecr_repository_name() -> str:
 
 ###############################################################################
 
-def get_ecr_repository_url(sts_client, region: str) -> str:
+def get_ecr_repository_url(region: str) -> str:
     """Get the ECR repository URL for the environment."""
-    return f"{get_account_id(sts_client)}.dkr.ecr.{region}.amazonaws.com/cloudrun-executor"
+    return f"{_get_cached_account_id(region)}.dkr.ecr.{region}.amazonaws.com/{get_ecr_repository_name()}"
 
 ###############################################################################
 
@@ -46,10 +133,16 @@ def get_account_id(sts_client) -> str:
 
 ###############################################################################
 
+@functools.lru_cache(maxsize=None)
+def _get_cached_account_id(region: str) -> str:
+    """Get the AWS account ID for a region, looked up once per process."""
+    return get_account_id(get_client('sts', region))
+
+###############################################################################
+
 def get_bucket_name(region: str) -> str:
     """Get the bucket name for the environment."""
-    sts_client = boto3.client('sts', region_name=region)
-    aws_acccount_id = get_account_id(sts_client)
+    aws_acccount_id = _get_cached_account_id(region)
     bucket_name = f"cloudrun-bucket-{region}-{aws_acccount_id}"
 
     return bucket_name
@@ -68,18 +161,21 @@ def get_cluster_name() -> str:
 
 ###############################################################################
 
+def get_container_name() -> str:
+    """Get the name of the executor container in the task definition."""
+    return f"cloudrun-executor"
+
+###############################################################################
+
 def _initialize_aws_clients(region: str) -> Dict[str, Any]:
     """Initialize and return AWS clients for various services."""
     print("\nInitializing AWS clients...")
     return {
-        'iam': boto3.client('iam', region_name=region),
-        's3': boto3.client('s3', region_name=region),
-        'ecs': boto3.client('ecs', region_name=region),
-        'ecr': boto3.client('ecr', region_name=region),
-        'logs': boto3.client('logs', region_name=region),
-        'ec2': boto3.client('ec2', region_name=region),
-        'dynamodb': boto3.client('dynamodb', region_name=region),
-        'sts': boto3.client('sts', region_name=region)
+        'iam': get_client('iam', region),
+        's3': get_client('s3', region),
+        'ecs': get_client('ecs', region),
+        'ecr': get_client('ecr', region),
+        'logs': get_client('logs', region)
     }
 
 ###############################################################################
@@ -92,6 +188,19 @@ def _create_s3_bucket(s3_client, region: str) -> None:
         s3_client.create_bucket(Bucket=bucket_name)
     except s3_client.exceptions.BucketAlreadyExists:
         print("S3 bucket already exists")
+        return
+
+    from botocore.exceptions import ClientError
+    try:
+        s3_client.put_bucket_tagging(
+            Bucket=bucket_name,
+            Tagging={'TagSet': [{'Key': _RESOURCE_TAG_KEY, 'Value': _RESOURCE_TAG_VALUE}]}
+        )
+    except ClientError as e:
+        # The tag only lets later runs skip this step, it's not worth failing over
+        if not _is_access_denied(e):
+            raise
+        print("No permission to tag the S3 bucket (s3:PutBucketTagging), continuing untagged")
 
 ###############################################################################
 
@@ -121,38 +230,55 @@ def _create_task_role(iam_client, task_role_name: str, additional_policies: list
         if additional_policies:
             policies.extend(additional_policies)
             
-        for policy in policies:
-            iam_client.attach_role_policy(
-                RoleName=task_role_name,
-                PolicyArn=policy
-            )
+        _attach_role_policies(iam_client, task_role_name, policies)
     except iam_client.exceptions.EntityAlreadyExistsException:
         print("ECS task role already exists")
         task_role = iam_client.get_role(RoleName=task_role_name)
         
         if additional_policies:
             print("Attaching additional policies to existing role...")
-            for policy in additional_policies:
-                try:
-                    iam_client.attach_role_policy(
-                        RoleName=task_role_name,
-                        PolicyArn=policy
-                    )
-                except iam_client.exceptions.EntityAlreadyExistsException:
-                    print(f"Policy {policy} already attached to role")
+            _attach_role_policies(iam_client, task_role_name, additional_policies)
     
     return task_role
 
 ###############################################################################
 
+def _attach_role_policies(iam_client, task_role_name: str, policies: list) -> None:
+    """Attach managed policies to a role, issuing the IAM calls in parallel."""
+    def attach(policy):
+        try:
+            iam_client.attach_role_policy(
+                RoleName=task_role_name,
+                PolicyArn=policy
+            )
+        except iam_client.exceptions.EntityAlreadyExistsException:
+            print(f"Policy {policy} already attached to role")
+
+    with ThreadPoolExecutor(max_workers=len(policies)) as executor:
+        list(executor.map(attach, policies))
+
+###############################################################################
+
 def _create_ecs_cluster(ecs_client) -> None:
     """Create ECS cluster if it doesn't exist."""
     print(f"\nCreating ECS cluster: {get_cluster_name()}")
+    from botocore.exceptions import ClientError
+    cluster_params = {
+        'clusterName': get_cluster_name(),
+        'capacityProviders': ['FARGATE', 'FARGATE_SPOT']
+    }
     try:
-        ecs_client.create_cluster(
-            clusterName=get_cluster_name(),
-            capacityProviders=['FARGATE', 'FARGATE_SPOT']
-        )
+        try:
+            ecs_client.create_cluster(
+                tags=[{'key': _RESOURCE_TAG_KEY, 'value': _RESOURCE_TAG_VALUE}],
+                **cluster_params
+            )
+        except ClientError as e:
+            # Tagging on create needs ecs:TagResource, which older policies lack
+            if not _is_access_denied(e):
+                raise
+            print("No permission to tag the ECS cluster (ecs:TagResource), creating it untagged")
+            ecs_client.create_cluster(**cluster_params)
     except ecs_client.exceptions.ClusterExists:
         print("ECS cluster already exists")
 
@@ -161,17 +287,63 @@ def _create_ecs_cluster(ecs_client) -> None:
 def _create_ecr_repository(ecr_client) -> None:
     """Create ECR repository if it doesn't exist."""
     print(f"\nCreating ECR repository: {get_ecr_repository_name()}")
+    from botocore.exceptions import ClientError
     try:
-        ecr_client.create_repository(repositoryName=get_ecr_repository_name())
+        try:
+            ecr_client.create_repository(
+                repositoryName=get_ecr_repository_name(),
+                tags=[{'Key': _RESOURCE_TAG_KEY, 'Value': _RESOURCE_TAG_VALUE}]
+            )
+        except ClientError as e:
+            # Tagging on create needs ecr:TagResource, which older policies lack
+            if not _is_access_denied(e):
+                raise
+            print("No permission to tag the ECR repository (ecr:TagResource), creating it untagged")
+            ecr_client.create_repository(repositoryName=get_ecr_repository_name())
     except ecr_client.exceptions.RepositoryAlreadyExistsException:
         print("ECR repository already exists")
 
 ###############################################################################
 
+def _create_log_group(logs_client) -> None:
+    """Create the CloudWatch log group the executor container logs to if it doesn't exist."""
+    print(f"\nCreating CloudWatch log group: {get_log_group()}")
+    try:
+        logs_client.create_log_group(logGroupName=get_log_group())
+    except logs_client.exceptions.ResourceAlreadyExistsException:
+        print("CloudWatch log group already exists")
+
+###############################################################################
+
+def _get_tagged_resource_arns(region: str) -> set:
+    """
+    Get the ARNs of every CloudRun-tagged resource in the region with one tagging API lookup.
+    
+    Without tag:GetResources permission nothing is reported as existing, and every
+    resource goes through its (idempotent) create call as before.
+    """
+    from botocore.exceptions import ClientError
+    tagging_client = get_client('resourcegroupstaggingapi', region)
+    paginator = tagging_client.get_paginator('get_resources')
+    arns = set()
+    try:
+        for page in paginator.paginate(TagFilters=[{'Key': _RESOURCE_TAG_KEY, 'Values': [_RESOURCE_TAG_VALUE]}]):
+            arns.update(resource['ResourceARN'] for resource in page['ResourceTagMappingList'])
+    except ClientError as e:
+        if not _is_access_denied(e):
+            raise
+        print("No permission to look up tagged resources (tag:GetResources), creating each resource")
+        return set()
+    return arns
+
+###############################################################################
+
 def _check_docker_daemon() -> None:
     """Check if Docker daemon is running."""
     try:
-        subprocess.run(['docker', 'info'], check=True, capture_output=True, text=True)
+        # 'docker info' also walks every image, container and volume, 'docker version'
+        # only needs the daemon to answer
+        subprocess.run(['docker', 'version', '--format', '{{.Server.Version}}'], check=True, capture_output=True, text=True)
         return
     except subprocess.CalledProcessError:
         raise RuntimeError(
@@ -184,6 +356,21 @@ def _check_docker_daemon() -> None:
 
 ###############################################################################
 
+def _link_or_copy(src: str, dst_dir: str) -> None:
+    """Hard link a file into a directory, copying it when they're on different filesystems."""
+    try:
+        os.link(src, os.path.join(dst_dir, os.path.basename(src)))
+    except OSError:
+        shutil.copy2(src, dst_dir)
+
+###############################################################################
+
+def _get_base_dir() -> str:
+    """Get the project directory holding pyproject.toml and src/cloudrun."""
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+###############################################################################
+
 def _prepare_build_context(temp_dir: str, **kwargs) -> None:
     """Prepare Docker build context in a temporary directory."""
     print("Creating temporary build directory...")
@@ -192,26 +379,20 @@ def _prepare_build_context(temp_dir: str, **kwargs) -> None:
     cloudrun_dir = os.path.join(src_dir, 'cloudrun')
     os.makedirs(cloudrun_dir, exist_ok=True)
 
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    base_dir = _get_base_dir()
     pyproject_toml = os.path.join(base_dir, 'pyproject.toml')
     
     if not os.path.exists(pyproject_toml):
         raise FileNotFoundError(f"pyproject.toml not found at {pyproject_toml}")
         
-    shutil.copy2(pyproject_toml, temp_dir)
+    _link_or_copy(pyproject_toml, temp_dir)
     print("Copied package configuration files")
     
     print("Copying package files...")
-    files_to_copy = [
-        '__init__.py',
-        'cli.py',
-        '_infrastructure.py',
-    ]
-    
     cloudrun_src_dir = os.path.join(base_dir, 'src', 'cloudrun')
-    for file in files_to_copy:
+    for file in _PACKAGE_FILES:
         src = os.path.join(cloudrun_src_dir, file)
-        shutil.copy2(src, cloudrun_dir)
+        _link_or_copy(src, cloudrun_dir)
     print("Copied package files")
 
     _prepare_docker_files(temp_dir, cloudrun_src_dir, **kwargs)
@@ -232,7 +413,7 @@ def _prepare_docker_files(temp_dir: str, cloudrun_src_dir: str, **kwargs) -> Non
         _create_custom_dockerfile(dockerfile_path, temp_dir, custom_docker_commands)
     else:
         # No custom commands, just copy the original
-        shutil.copy2(dockerfile_path, temp_dir)
+        _link_or_copy(dockerfile_path, temp_dir)
     
     print("Creating additional requirements file...")
     additional_requirements_text = kwargs.get('additional_requirements_text', '')
@@ -242,7 +423,7 @@ def _prepare_docker_files(temp_dir: str, cloudrun_src_dir: str, **kwargs) -> Non
 
     docker_dir = os.path.join(os.path.join(temp_dir, 'src', 'cloudrun'), 'docker')
     os.makedirs(docker_dir, exist_ok=True)
-    shutil.copy2(os.path.join(docker_dir_path, 'entrypoint.sh'), docker_dir)
+    _link_or_copy(os.path.join(docker_dir_path, 'entrypoint.sh'), docker_dir)
     print("Copied Docker-related files")
 
 ###############################################################################
@@ -277,22 +458,22 @@ def _create_custom_dockerfile(dockerfile_path: str, temp_dir: str, custom_docker
         print("Created modified Dockerfile with custom commands")
     else:
         # If insertion point not found, just copy the original
-        shutil.copy2(dockerfile_path, temp_dir)
+        _link_or_copy(dockerfile_path, temp_dir)
         print("Warning: Could not find insertion point for custom Docker commands. Using original Dockerfile.")
 
 ###############################################################################
-def _docker_login_build_push(ecr_repo: str, region: str, temp_dir: str) -> None:
+def _docker_login_build_push(ecr_repo: str, region: str, temp_dir: str, image_tag: str) -> None:
     """Login to ECR, build and push Docker image."""
     print("\nLogging into ECR...")
     try:
-        password = subprocess.check_output([
-            'aws', 'ecr', 'get-login-password',
-            '--region', region
-        ]).decode('utf-8').strip()
+        # Fetch the registry token with the shared ECR client rather than
+        # starting the AWS CLI just to run get-login-password
+        auth_data = get_client('ecr', region).get_authorization_token()['authorizationData'][0]
+        username, password = base64.b64decode(auth_data['authorizationToken']).decode('utf-8').split(':', 1)
         
         subprocess.run([
             'docker', 'login',
-            '--username', 'AWS',
+            '--username', username,
             '--password-stdin',
             ecr_repo
         ], check=True, input=password.encode('utf-8'))
@@ -302,11 +483,14 @@ def _docker_login_build_push(ecr_repo: str, region: str, temp_dir: str) -> None:
             'docker', 'build',
             '--platform', 'linux/amd64',
             '-t', ecr_repo,
+            '-t', f"{ecr_repo}:{image_tag}",
             temp_dir
         ], check=True)
         
         print("\nPushing Docker image to ECR...")
         subprocess.run(['docker', 'push', ecr_repo], check=True)
+        # Only the tag is new here, the layers were uploaded by the push above
+        subprocess.run(['docker', 'push', f"{ecr_repo}:{image_tag}"], check=True)
     except subprocess.CalledProcessError as e:
         _handle_docker_error(e)
     except Exception as e:
@@ -329,16 +513,59 @@ def _handle_docker_error(e: subprocess.CalledProcessError) -> None:
 
 ###############################################################################
 
+def _hash_build_context(temp_dir: str) -> str:
+    """Hash the paths and contents of every file in the Docker build context."""
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(temp_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            file_path = os.path.join(dirpath, filename)
+            digest.update(os.path.relpath(file_path, temp_dir).encode('utf-8'))
+            with open(file_path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+###############################################################################
+
+def _promote_existing_image(ecr_client, image_tag: str) -> bool:
+    """Point the latest tag at an already pushed image, returns False if there is no such image."""
+    response = ecr_client.batch_get_image(
+        repositoryName=get_ecr_repository_name(),
+        imageIds=[{'imageTag': image_tag}]
+    )
+    if not response['images']:
+        return False
+
+    try:
+        ecr_client.put_image(
+            repositoryName=get_ecr_repository_name(),
+            imageManifest=response['images'][0]['imageManifest'],
+            imageTag='latest'
+        )
+    except ecr_client.exceptions.ImageAlreadyExistsException:
+        pass
+    return True
+
+###############################################################################
+
 def _build_and_push_docker_image(ecr_repo: str, region: str, **kwargs) -> None:
     """Build and push Docker image to ECR."""
     print("\nPreparing Docker build context...")
     
-    # Check if Docker daemon is running before proceeding
-    _check_docker_daemon()
-    
     with tempfile.TemporaryDirectory() as temp_dir:
         _prepare_build_context(temp_dir, **kwargs)
-        _docker_login_build_push(ecr_repo, region, temp_dir)
+
+        # Images are also tagged with a hash of their build context, so an
+        # identical context never has to be built and pushed again. force_rebuild
+        # still builds, to pick up a patched base image or new package releases.
+        image_tag = f"context-{_hash_build_context(temp_dir)[:12]}"
+        if not kwargs.get('force_rebuild', False) and _promote_existing_image(get_client('ecr', region), image_tag):
+            print(f"\nDocker image {image_tag} is already in ECR, skipping build and push")
+            return
+
+        # Check if Docker daemon is running before proceeding
+        _check_docker_daemon()
+        _docker_login_build_push(ecr_repo, region, temp_dir, image_tag)
 
 ###############################################################################
 
@@ -347,7 +574,9 @@ def _create_task_definition(ecs_client, task_role: Dict[str, Any], ecr_repo: str
     print("\nCreating ECS task definition...")
     task_family = get_task_family()
     
-    return ecs_client.register_task_definition(
+    # The task role may have been created moments ago and not be assumable yet
+    return call_with_iam_retry(
+        ecs_client.register_task_definition,
         family=task_family,
         networkMode='awsvpc',
         requiresCompatibilities=['FARGATE'],
@@ -356,13 +585,13 @@ def _create_task_definition(ecs_client, task_role: Dict[str, Any], ecr_repo: str
         executionRoleArn=task_role['Role']['Arn'],
         taskRoleArn=task_role['Role']['Arn'],
         containerDefinitions=[{
-            'name': 'cloudrun-executor',
+            'name': get_container_name(),
             'image': ecr_repo,
             'essential': True,
             'logConfiguration': {
                 'logDriver': 'awslogs',
                 'options': {
-                    'awslogs-group': '/ecs/cloudrun',
+                    'awslogs-group': get_log_group(),
                     'awslogs-region': region,
                     'awslogs-stream-prefix': 'ecs'
                 }
@@ -375,17 +604,19 @@ def _create_task_definition(ecs_client, task_role: Dict[str, Any], ecr_repo: str
 def _delete_ecs_cluster(ecs_client) -> None:
     """Delete ECS cluster and its tasks."""
     print(f"\nDeleting ECS cluster and tasks...")
-    cluster_name = f'cloudrun-cluster'
+    cluster_name = get_cluster_name()
     try:
-        tasks = ecs_client.list_tasks(cluster=cluster_name)
-        if tasks.get('taskArns'):
-            print("Stopping running tasks...")
-            ecs_client.stop_task(
-                cluster=cluster_name,
-                task=tasks['taskArns'][0]
-            )
+        paginator = ecs_client.get_paginator('list_tasks')
+        task_arns = [arn for page in paginator.paginate(cluster=cluster_name) for arn in page['taskArns']]
+        if task_arns:
+            print(f"Stopping {len(task_arns)} running tasks...")
+            with ThreadPoolExecutor(max_workers=_DESTROY_MAX_WORKERS) as executor:
+                list(executor.map(lambda task_arn: ecs_client.stop_task(cluster=cluster_name, task=task_arn), task_arns))
+
+            # DescribeTasks, which the waiter polls, takes at most 100 tasks
             waiter = ecs_client.get_waiter('tasks_stopped')
-            waiter.wait(cluster=cluster_name, tasks=tasks['taskArns'])
+            for i in range(0, len(task_arns), 100):
+                waiter.wait(cluster=cluster_name, tasks=task_arns[i:i + 100])
         
         print("Deleting cluster...")
         ecs_client.delete_cluster(cluster=cluster_name)
@@ -398,9 +629,10 @@ def _delete_task_definitions(ecs_client) -> None:
     """Delete all task definitions."""
     print(f"\nDeleting task definitions...")
     try:
-        task_definitions = ecs_client.list_task_definitions(familyPrefix='cloudrun-task')
-        for task_def in task_definitions.get('taskDefinitionArns', []):
-            ecs_client.deregister_task_definition(taskDefinition=task_def)
+        paginator = ecs_client.get_paginator('list_task_definitions')
+        task_definitions = [arn for page in paginator.paginate(familyPrefix=get_task_family()) for arn in page['taskDefinitionArns']]
+        with ThreadPoolExecutor(max_workers=_DESTROY_MAX_WORKERS) as executor:
+            list(executor.map(lambda task_def: ecs_client.deregister_task_definition(taskDefinition=task_def), task_definitions))
     except ecs_client.exceptions.ClientException:
         print("No task definitions found to delete")
 
@@ -409,7 +641,7 @@ def _delete_task_definitions(ecs_client) -> None:
 def _delete_iam_role(iam_client) -> None:
     """Delete IAM role and its attached policies."""
     print(f"\nDeleting IAM roles...")
-    roles_to_delete = ['cloudrun-task-role', 'cloudrun-lambda-role']
+    roles_to_delete = [get_task_role_name(), 'cloudrun-lambda-role']
     
     for role_name in roles_to_delete:
         try:
@@ -445,12 +677,15 @@ def _delete_s3_bucket(s3_client, region: str) -> None:
     if bucket_name:
         try:
             print("Deleting bucket contents...")
-            objects = s3_client.list_objects_v2(Bucket=bucket_name)
-            if objects.get('Contents'):
-                s3_client.delete_objects(
-                    Bucket=bucket_name,
-                    Delete={'Objects': [{'Key': obj['Key']} for obj in objects['Contents']]}
-                )
+            # Each page holds up to 1000 keys, the most a single DeleteObjects call takes
+            paginator = s3_client.get_paginator('list_objects_v2')
+            batches = [
+                [{'Key': obj['Key']} for obj in page['Contents']]
+                for page in paginator.paginate(Bucket=bucket_name)
+                if page.get('Contents')
+            ]
+            with ThreadPoolExecutor(max_workers=_DESTROY_MAX_WORKERS) as executor:
+                list(executor.map(lambda objects: s3_client.delete_objects(Bucket=bucket_name, Delete={'Objects': objects}), batches))
             
             print("Deleting bucket...")
             s3_client.delete_bucket(Bucket=bucket_name)
@@ -462,7 +697,7 @@ def _delete_s3_bucket(s3_client, region: str) -> None:
 def _delete_ecr_repository(ecr_client) -> None:
     """Delete ECR repository."""
     print(f"\nDeleting ECR repository...")
-    repo_name = f'cloudrun-executor'
+    repo_name = get_ecr_repository_name()
     try:
         ecr_client.delete_repository(repositoryName=repo_name, force=True)
     except ecr_client.exceptions.RepositoryNotFoundException:
@@ -470,6 +705,61 @@ def _delete_ecr_repository(ecr_client) -> None:
 
 ###############################################################################
 
+def _delete_log_group(logs_client) -> None:
+    """Delete the CloudWatch log group and the executor logs in it."""
+    print(f"\nDeleting CloudWatch log group...")
+    try:
+        logs_client.delete_log_group(logGroupName=get_log_group())
+    except logs_client.exceptions.ResourceNotFoundException:
+        print("No CloudWatch log group found to delete")
+
+###############################################################################
+
+def _infrastructure_fingerprint(**kwargs) -> str:
+    """Hash the package, its dependencies, Docker files and settings that the infrastructure is built from."""
+    digest = hashlib.sha256()
+    # Same files _prepare_build_context() copies, the image pip installs from pyproject.toml
+    cloudrun_src_dir = os.path.join('src', 'cloudrun')
+    files = ['pyproject.toml'] + [
+        os.path.join(cloudrun_src_dir, file)
+        for file in _PACKAGE_FILES + [os.path.join('docker', 'Dockerfile'), os.path.join('docker', 'entrypoint.sh')]
+    ]
+    base_dir = _get_base_dir()
+    for file in files:
+        with open(os.path.join(base_dir, file), 'rb') as f:
+            digest.update(file.encode('utf-8'))
+            digest.update(f.read())
+
+    settings = {
+        'region': kwargs.get('region', 'us-east-1'),
+        'additional_policies': kwargs.get('additional_policies'),
+        'additional_requirements_text': kwargs.get('additional_requirements_text', ''),
+        'custom_docker_commands': kwargs.get('custom_docker_commands'),
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+###############################################################################
+
+def _is_infrastructure_current(ecs_client, fingerprint: str) -> bool:
+    """Check whether the active task definition was created from the same fingerprint."""
+    try:
+        response = ecs_client.describe_task_definition(
+            taskDefinition=get_task_family(),
+            include=['TAGS']
+        )
+    except ecs_client.exceptions.ClientException:
+        return False
+
+    if response['taskDefinition'].get('status') != 'ACTIVE':
+        return False
+    return any(
+        tag['key'] == _FINGERPRINT_TAG and tag['value'] == fingerprint
+        for tag in response.get('tags', [])
+    )
+
+###############################################################################
+
 def create_infrastructure(**kwargs) -> Dict[str, Any]:
     """
     Initialize AWS infrastructure for CloudRun.
@@ -495,25 +785,60 @@ def create_infrastructure(**kwargs) -> Dict[str, Any]:
     
     # Initialize AWS clients
     aws_clients = _initialize_aws_clients(region)
-    
-    # Create S3 bucket with environment name
-    _create_s3_bucket(aws_clients['s3'], region)
-
-    # Create ECS task execution role with environment name
-    task_role = _create_task_role(aws_clients['iam'], get_task_role_name(), kwargs.get('additional_policies'))
 
-    # Create ECS cluster with environment name
-    _create_ecs_cluster(aws_clients['ecs'])
-
-    # Create ECR repository with environment name
-    _create_ecr_repository(aws_clients['ecr'])
+    # Nothing to do if the last successful run used the same package and settings
+    fingerprint = _infrastructure_fingerprint(**kwargs)
+    if not kwargs.get('force_rebuild', False) and _is_infrastructure_current(aws_clients['ecs'], fingerprint):
+        print("\nInfrastructure is already up to date, skipping (use force_rebuild=True to rebuild)")
+        return
     
-    # Create task definition first
-    ecr_repo = get_ecr_repository_url(aws_clients['sts'], region)
-    _create_task_definition(aws_clients['ecs'], task_role, ecr_repo, region)
-
-    # Build and push Docker image
-    _build_and_push_docker_image(ecr_repo, region, **kwargs)
+    # Find the tagged bucket and repository so they are only created when missing.
+    # The tagging API can briefly list deleted resources, so force_rebuild skips
+    # the lookup and issues every create call. The cluster is always created:
+    # create_cluster is idempotent, and a deleted (INACTIVE) cluster stays listed
+    # after destroy_infrastructure(), which would leave run() with no cluster.
+    existing_arns = set() if kwargs.get('force_rebuild', False) else _get_tagged_resource_arns(region)
+    account_id = _get_cached_account_id(region)
+    bucket_arn = f"arn:aws:s3:::{get_bucket_name(region)}"
+    repository_arn = f"arn:aws:ecr:{region}:{account_id}:repository/{get_ecr_repository_name()}"
+
+    # Create the S3 bucket, task role, log group, ECS cluster and ECR repository in
+    # parallel, they don't depend on each other and are each a few AWS round-trips
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(_create_log_group, aws_clients['logs'])]
+        if bucket_arn not in existing_arns:
+            futures.append(executor.submit(_create_s3_bucket, aws_clients['s3'], region))
+        futures.append(executor.submit(_create_ecs_cluster, aws_clients['ecs']))
+        if repository_arn not in existing_arns:
+            futures.append(executor.submit(_create_ecr_repository, aws_clients['ecr']))
+        role_future = executor.submit(_create_task_role, aws_clients['iam'], get_task_role_name(), kwargs.get('additional_policies'))
+
+    for future in futures:
+        future.result()
+    task_role = role_future.result()
+    
+    # Register the task definition while the Docker image is built and pushed,
+    # it only references the image URL so neither step waits on the other
+    ecr_repo = get_ecr_repository_url(region)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        task_definition_future = executor.submit(_create_task_definition, aws_clients['ecs'], task_role, ecr_repo, region)
+        image_future = executor.submit(_build_and_push_docker_image, ecr_repo, region, **kwargs)
+
+    task_definition = task_definition_future.result()
+    image_future.result()
+
+    # Only mark the infrastructure as current once everything has succeeded
+    from botocore.exceptions import ClientError
+    try:
+        aws_clients['ecs'].tag_resource(
+            resourceArn=task_definition['taskDefinition']['taskDefinitionArn'],
+            tags=[{'key': _FINGERPRINT_TAG, 'value': fingerprint}]
+        )
+    except ClientError as e:
+        # Without the tag the next run simply can't skip the setup
+        if not _is_access_denied(e):
+            raise
+        print("No permission to tag the task definition (ecs:TagResource), later runs will redo the setup")
 
     print(f"\n=== CloudRun Infrastructure Creation Complete ===")
 
@@ -522,7 +847,7 @@ def create_infrastructure(**kwargs) -> Dict[str, Any]:
 def destroy_infrastructure(region: str) -> None:
     """
     Destroy all AWS infrastructure created by CloudRun for a specific environment.
-    This includes ECS cluster, IAM roles, S3 bucket, and ECR repository.
+    This includes ECS cluster, IAM roles, S3 bucket, ECR repository and log group.
     Also cleans up the configuration by removing all CLOUDRUN_ variables.
     
     Args:
@@ -534,20 +859,23 @@ def destroy_infrastructure(region: str) -> None:
     # Initialize AWS clients
     aws_clients = _initialize_aws_clients(region)
     
-    # Delete ECS cluster and tasks
-    _delete_ecs_cluster(aws_clients['ecs'])
-    
-    # Delete task definition
-    _delete_task_definitions(aws_clients['ecs'])
-    
-    # Delete IAM roles
-    _delete_iam_role(aws_clients['iam'])
-    
-    # Delete S3 bucket
-    _delete_s3_bucket(aws_clients['s3'])
-    
-    # Delete ECR repository
-    _delete_ecr_repository(aws_clients['ecr'])
+    # Each service is torn down independently, only the task definitions have
+    # to wait for the cluster's tasks to stop
+    def delete_ecs_resources():
+        _delete_ecs_cluster(aws_clients['ecs'])
+        _delete_task_definitions(aws_clients['ecs'])
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [
+            executor.submit(delete_ecs_resources),
+            executor.submit(_delete_iam_role, aws_clients['iam']),
+            executor.submit(_delete_s3_bucket, aws_clients['s3'], region),
+            executor.submit(_delete_ecr_repository, aws_clients['ecr']),
+            executor.submit(_delete_log_group, aws_clients['logs'])
+        ]
+
+    for future in futures:
+        future.result()
 
     print(f"\n=== CloudRun Infrastructure Destruction Complete ===")
 
@@ -2,14 +2,12 @@ import argparse
 from datetime import datetime
 import sys
 import time
-import boto3
 import json
 from typing import Optional, List, Dict, Any
-from botocore.exceptions import ClientError
 import cloudrun._infrastructure as _infrastructure
 
 ###############################################################################
-def get_log_streams(logs_client: boto3.client, log_group: str, stream_prefix: Optional[str] = None) -> List[Dict]:
+def get_log_streams(logs_client, log_group: str, stream_prefix: Optional[str] = None) -> List[Dict]:
     """Get all log streams for a given log group, optionally filtered by prefix."""
     # print(f"Getting log streams for {log_group} with prefix {stream_prefix}")
 
@@ -45,6 +43,8 @@ def tail_logs(
         start_time: Optional start time in milliseconds since epoch
         print_stream_name: Whether to print the stream name in log output
     """
+    from botocore.exceptions import ClientError
+
     print("\nTailing logs... (Press Ctrl+C to stop)")
     
     # Set start time to now if not provided
@@ -57,7 +57,7 @@ def tail_logs(
     # Cache to track seen events and avoid duplicates
     seen_events = {}
     
-    logs_client = boto3.client('logs', region_name=region)
+    logs_client = _infrastructure.get_client('logs', region)
     # Function to fetch and return new events
     def fetch_events():
         nonlocal start_time
@@ -74,7 +74,7 @@ def tail_logs(
 
         if task_id:
             try:
-                prefix = f"ecs/cloudrun-executor/{task_id}"
+                prefix = f"ecs/{_infrastructure.get_container_name()}/{task_id}"
                 streams = get_log_streams(logs_client, log_group, prefix)
                 if not streams:
                     print(f"No streams found for task ID: {task_id}")
@@ -199,7 +199,7 @@ def get_tasks(region: str) -> List[Dict[str, Any]]:
     Returns:
         List of task dictionaries with details
     """
-    ecs = boto3.client('ecs', region_name=region)
+    ecs = _infrastructure.get_client('ecs', region)
     cluster_name = _infrastructure.get_cluster_name()
     
     try:
@@ -234,7 +234,7 @@ def get_tasks(region: str) -> List[Dict[str, Any]]:
             # Get the command that was used to run this task
             command = None
             for override in task.get('overrides', {}).get('containerOverrides', []):
-                if override.get('name') == 'cloudrun-executor' and 'command' in override:
+                if override.get('name') == _infrastructure.get_container_name() and 'command' in override:
                     command = override['command']
                     break
 
@@ -271,7 +271,7 @@ def delete_task(task_id: str, region: str) -> bool:
         print("Error: Task ID is required")
         return False
         
-    ecs = boto3.client('ecs', region_name=region)
+    ecs = _infrastructure.get_client('ecs', region)
     cluster_name = _infrastructure.get_cluster_name()
     
     try:
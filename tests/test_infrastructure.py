@@ -0,0 +1,298 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from botocore.exceptions import ClientError
+from cloudrun import _infrastructure
+
+###############################################################################
+
+def client_error(code, message='', operation='Operation'):
+    """Build a botocore ClientError with the given error code."""
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+###############################################################################
+
+@pytest.fixture
+def mock_client():
+    """A mocked boto3 client whose modeled exceptions are real exception classes"""
+    client = MagicMock()
+    for name in ('BucketAlreadyExists', 'ClusterExists', 'ClientException', 'ImageAlreadyExistsException', 'RepositoryAlreadyExistsException'):
+        setattr(client.exceptions, name, type(name, (Exception,), {}))
+    return client
+
+###############################################################################
+
+def test_tagged_resource_lookup_falls_back_without_permission(mock_client):
+    """Test that a denied tag:GetResources reports no existing resources instead of failing"""
+    mock_client.get_paginator.return_value.paginate.side_effect = client_error('AccessDeniedException')
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_client):
+        assert _infrastructure._get_tagged_resource_arns('us-east-1') == set()
+
+###############################################################################
+
+def test_cluster_created_untagged_without_tag_permission(mock_client):
+    """Test that the cluster is created without tags when ecs:TagResource is denied"""
+    mock_client.create_cluster.side_effect = [client_error('AccessDeniedException'), {}]
+
+    _infrastructure._create_ecs_cluster(mock_client)
+
+    first_call, second_call = mock_client.create_cluster.call_args_list
+    assert first_call[1]['tags'] == [{'key': 'app', 'value': 'cloudrun'}]
+    assert 'tags' not in second_call[1]
+    mock_client.tag_resource.assert_not_called()
+
+###############################################################################
+
+def test_repository_created_untagged_without_tag_permission(mock_client):
+    """Test that the ECR repository is created without tags when ecr:TagResource is denied"""
+    mock_client.create_repository.side_effect = [client_error('AccessDeniedException'), {}]
+
+    _infrastructure._create_ecr_repository(mock_client)
+
+    first_call, second_call = mock_client.create_repository.call_args_list
+    assert first_call[1]['tags'] == [{'Key': 'app', 'Value': 'cloudrun'}]
+    assert 'tags' not in second_call[1]
+
+###############################################################################
+
+def test_bucket_tagging_denied_is_not_fatal(mock_client):
+    """Test that a denied s3:PutBucketTagging leaves the new bucket untagged instead of failing"""
+    mock_client.put_bucket_tagging.side_effect = client_error('AccessDenied')
+
+    with patch('cloudrun._infrastructure._get_cached_account_id', return_value='123456789012'):
+        _infrastructure._create_s3_bucket(mock_client, 'us-east-1')
+
+    mock_client.create_bucket.assert_called_once()
+
+###############################################################################
+
+def test_unchanged_build_context_reuses_pushed_image(mock_client):
+    """Test that an image already pushed for the same build context is retagged instead of rebuilt"""
+    mock_client.batch_get_image.return_value = {'images': [{'imageManifest': '{}'}]}
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_client), \
+         patch('cloudrun._infrastructure._prepare_build_context'), \
+         patch('cloudrun._infrastructure._docker_login_build_push') as mock_build:
+        _infrastructure._build_and_push_docker_image('repo-url', 'us-east-1')
+
+    mock_build.assert_not_called()
+    assert mock_client.put_image.call_args[1]['imageTag'] == 'latest'
+
+###############################################################################
+
+def test_force_rebuild_builds_even_when_image_exists(mock_client):
+    """Test that force_rebuild builds and pushes instead of reusing the image for the build context"""
+    mock_client.batch_get_image.return_value = {'images': [{'imageManifest': '{}'}]}
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_client), \
+         patch('cloudrun._infrastructure._prepare_build_context'), \
+         patch('cloudrun._infrastructure._check_docker_daemon'), \
+         patch('cloudrun._infrastructure._docker_login_build_push') as mock_build:
+        _infrastructure._build_and_push_docker_image('repo-url', 'us-east-1', force_rebuild=True)
+
+    mock_build.assert_called_once()
+    mock_client.batch_get_image.assert_not_called()
+
+###############################################################################
+
+def test_iam_retry_waits_for_role_propagation():
+    """Test that ECS role errors are retried with a growing delay until the call succeeds"""
+    call = MagicMock(side_effect=[
+        client_error('InvalidParameterException', 'ECS was unable to assume the role'),
+        client_error('InvalidParameterException', 'ECS was unable to assume the role'),
+        'ok'
+    ])
+
+    with patch('cloudrun._infrastructure.time.sleep') as mock_sleep, \
+         patch('cloudrun._infrastructure.random.random', return_value=0):
+        assert _infrastructure.call_with_iam_retry(call, cluster='c') == 'ok'
+
+    assert call.call_count == 3
+    assert call.call_args[1] == {'cluster': 'c'}
+    assert [args[0][0] for args in mock_sleep.call_args_list] == [0.5, 1.0]
+
+###############################################################################
+
+@pytest.mark.parametrize('error', [
+    client_error('InvalidParameterException', 'No Fargate configuration exists for given values'),
+    client_error('ThrottlingException', 'Role is being throttled'),
+])
+def test_iam_retry_raises_unrelated_errors(error):
+    """Test that errors other than an unassumable role are raised straight away"""
+    call = MagicMock(side_effect=error)
+
+    with patch('cloudrun._infrastructure.time.sleep') as mock_sleep:
+        with pytest.raises(ClientError):
+            _infrastructure.call_with_iam_retry(call)
+
+    assert call.call_count == 1
+    mock_sleep.assert_not_called()
+
+###############################################################################
+
+def test_iam_retry_gives_up_after_max_attempts():
+    """Test that a role that never propagates is reported after the last attempt"""
+    call = MagicMock(side_effect=client_error('InvalidParameterException', 'Role is not valid'))
+
+    with patch('cloudrun._infrastructure.time.sleep') as mock_sleep:
+        with pytest.raises(ClientError):
+            _infrastructure.call_with_iam_retry(call)
+
+    assert call.call_count == _infrastructure._IAM_RETRY_MAX_ATTEMPTS
+    assert mock_sleep.call_count == _infrastructure._IAM_RETRY_MAX_ATTEMPTS - 1
+
+###############################################################################
+
+@pytest.mark.parametrize('tags, status, expected', [
+    ([{'key': 'cloudrun:fingerprint', 'value': 'abc'}], 'ACTIVE', True),
+    ([{'key': 'cloudrun:fingerprint', 'value': 'old'}], 'ACTIVE', False),
+    ([{'key': 'cloudrun:fingerprint', 'value': 'abc'}], 'INACTIVE', False),
+    ([], 'ACTIVE', False),
+])
+def test_infrastructure_current_only_for_matching_active_fingerprint(mock_client, tags, status, expected):
+    """Test that only an active task definition tagged with the same fingerprint counts as current"""
+    mock_client.describe_task_definition.return_value = {'taskDefinition': {'status': status}, 'tags': tags}
+
+    assert _infrastructure._is_infrastructure_current(mock_client, 'abc') is expected
+
+###############################################################################
+
+def test_create_infrastructure_skips_when_current():
+    """Test that an unchanged setup issues no create calls"""
+    with patch('cloudrun._infrastructure._initialize_aws_clients', return_value={'ecs': MagicMock()}), \
+         patch('cloudrun._infrastructure._is_infrastructure_current', return_value=True), \
+         patch('cloudrun._infrastructure._get_tagged_resource_arns') as mock_lookup, \
+         patch('cloudrun._infrastructure._create_task_role') as mock_create_role:
+        _infrastructure.create_infrastructure(region='us-east-1')
+
+    mock_lookup.assert_not_called()
+    mock_create_role.assert_not_called()
+
+###############################################################################
+
+def test_create_infrastructure_only_creates_missing_resources():
+    """Test that a tagged bucket is not created again, while the cluster always is"""
+    account_id = '123456789012'
+    existing_arns = {
+        'arn:aws:s3:::cloudrun-bucket-us-east-1-123456789012',
+        f"arn:aws:ecs:us-east-1:{account_id}:cluster/{_infrastructure.get_cluster_name()}",
+    }
+    aws_clients = {service: MagicMock() for service in ('iam', 's3', 'ecs', 'ecr', 'logs')}
+
+    with patch('cloudrun._infrastructure._initialize_aws_clients', return_value=aws_clients), \
+         patch('cloudrun._infrastructure._is_infrastructure_current', return_value=False), \
+         patch('cloudrun._infrastructure._get_tagged_resource_arns', return_value=existing_arns), \
+         patch('cloudrun._infrastructure._get_cached_account_id', return_value=account_id), \
+         patch('cloudrun._infrastructure._create_s3_bucket') as mock_create_bucket, \
+         patch('cloudrun._infrastructure._create_ecs_cluster') as mock_create_cluster, \
+         patch('cloudrun._infrastructure._create_ecr_repository') as mock_create_repository, \
+         patch('cloudrun._infrastructure._create_log_group'), \
+         patch('cloudrun._infrastructure._create_task_role', return_value={'Role': {'Arn': 'role-arn'}}), \
+         patch('cloudrun._infrastructure._create_task_definition', return_value={'taskDefinition': {'taskDefinitionArn': 'td-arn'}}), \
+         patch('cloudrun._infrastructure._build_and_push_docker_image'):
+        _infrastructure.create_infrastructure(region='us-east-1')
+
+    mock_create_bucket.assert_not_called()
+    # A cluster deleted by destroy_infrastructure() can still be listed as tagged
+    mock_create_cluster.assert_called_once()
+    mock_create_repository.assert_called_once()
+    assert aws_clients['ecs'].tag_resource.call_args[1]['tags'][0]['key'] == 'cloudrun:fingerprint'
+
+###############################################################################
+
+def test_tagged_resource_lookup_collects_every_page(mock_client):
+    """Test that the tag lookup returns the ARNs from all result pages"""
+    mock_client.get_paginator.return_value.paginate.return_value = [
+        {'ResourceTagMappingList': [{'ResourceARN': 'arn:1'}, {'ResourceARN': 'arn:2'}]},
+        {'ResourceTagMappingList': [{'ResourceARN': 'arn:3'}]},
+    ]
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_client):
+        assert _infrastructure._get_tagged_resource_arns('us-east-1') == {'arn:1', 'arn:2', 'arn:3'}
+
+###############################################################################
+
+def test_promote_existing_image(mock_client):
+    """Test that a pushed image is retagged as latest, and a missing one is reported"""
+    mock_client.batch_get_image.return_value = {'images': []}
+    assert _infrastructure._promote_existing_image(mock_client, 'context-abc') is False
+    mock_client.put_image.assert_not_called()
+
+    mock_client.batch_get_image.return_value = {'images': [{'imageManifest': '{"schemaVersion": 2}'}]}
+    mock_client.put_image.side_effect = mock_client.exceptions.ImageAlreadyExistsException()
+    assert _infrastructure._promote_existing_image(mock_client, 'context-abc') is True
+    assert mock_client.put_image.call_args[1]['imageManifest'] == '{"schemaVersion": 2}'
+
+###############################################################################
+
+def test_delete_s3_bucket_empties_every_page(mock_client):
+    """Test that each listed page is deleted with its own DeleteObjects call before the bucket"""
+    mock_client.exceptions.NoSuchBucket = type('NoSuchBucket', (Exception,), {})
+    mock_client.get_paginator.return_value.paginate.return_value = [
+        {'Contents': [{'Key': f"jobs/{i}.zip"} for i in range(1000)]},
+        {'Contents': [{'Key': 'jobs/last.zip'}]},
+        {},
+    ]
+
+    with patch('cloudrun._infrastructure._get_cached_account_id', return_value='123456789012'):
+        _infrastructure._delete_s3_bucket(mock_client, 'us-east-1')
+
+    batch_sizes = sorted(len(call[1]['Delete']['Objects']) for call in mock_client.delete_objects.call_args_list)
+    assert batch_sizes == [1, 1000]
+    mock_client.delete_bucket.assert_called_once_with(Bucket='cloudrun-bucket-us-east-1-123456789012')
+
+###############################################################################
+
+def test_delete_ecs_cluster_stops_every_task(mock_client):
+    """Test that all running tasks are stopped and waited on in DescribeTasks-sized chunks"""
+    mock_client.exceptions.ClusterNotFoundException = type('ClusterNotFoundException', (Exception,), {})
+    task_arns = [f"task-{i}" for i in range(150)]
+    mock_client.get_paginator.return_value.paginate.return_value = [{'taskArns': task_arns[:100]}, {'taskArns': task_arns[100:]}]
+    waiter = mock_client.get_waiter.return_value
+
+    _infrastructure._delete_ecs_cluster(mock_client)
+
+    assert sorted(call[1]['task'] for call in mock_client.stop_task.call_args_list) == sorted(task_arns)
+    assert [len(call[1]['tasks']) for call in waiter.wait.call_args_list] == [100, 50]
+    mock_client.delete_cluster.assert_called_once()
+
+###############################################################################
+
+def test_destroy_infrastructure_tears_down_every_service():
+    """Test that every resource type is deleted, with the bucket looked up in the given region"""
+    aws_clients = {service: MagicMock() for service in ('iam', 's3', 'ecs', 'ecr', 'logs')}
+
+    with patch('cloudrun._infrastructure._initialize_aws_clients', return_value=aws_clients), \
+         patch('cloudrun._infrastructure._delete_ecs_cluster') as mock_cluster, \
+         patch('cloudrun._infrastructure._delete_task_definitions') as mock_task_definitions, \
+         patch('cloudrun._infrastructure._delete_iam_role') as mock_role, \
+         patch('cloudrun._infrastructure._delete_s3_bucket') as mock_bucket, \
+         patch('cloudrun._infrastructure._delete_ecr_repository') as mock_repository, \
+         patch('cloudrun._infrastructure._delete_log_group') as mock_log_group:
+        _infrastructure.destroy_infrastructure('eu-west-1')
+
+    mock_cluster.assert_called_once_with(aws_clients['ecs'])
+    mock_task_definitions.assert_called_once_with(aws_clients['ecs'])
+    mock_role.assert_called_once_with(aws_clients['iam'])
+    mock_bucket.assert_called_once_with(aws_clients['s3'], 'eu-west-1')
+    mock_repository.assert_called_once_with(aws_clients['ecr'])
+    mock_log_group.assert_called_once_with(aws_clients['logs'])
+
+###############################################################################
+
+def test_fingerprint_changes_with_dependencies(tmp_path):
+    """Test that editing pyproject.toml, which the image installs from, changes the fingerprint"""
+    docker_dir = tmp_path / 'src' / 'cloudrun' / 'docker'
+    docker_dir.mkdir(parents=True)
+    for file in _infrastructure._PACKAGE_FILES:
+        (tmp_path / 'src' / 'cloudrun' / file).write_text('')
+    (docker_dir / 'Dockerfile').write_text('FROM python:3.9-slim')
+    (docker_dir / 'entrypoint.sh').write_text('')
+    (tmp_path / 'pyproject.toml').write_text('dependencies = ["boto3"]')
+
+    with patch('cloudrun._infrastructure._get_base_dir', return_value=str(tmp_path)):
+        before = _infrastructure._infrastructure_fingerprint(region='us-east-1')
+        (tmp_path / 'pyproject.toml').write_text('dependencies = ["boto3", "numpy"]')
+        after = _infrastructure._infrastructure_fingerprint(region='us-east-1')
+
+    assert before != after
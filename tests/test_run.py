@@ -1,8 +1,17 @@
+import io
+import base64
+import hashlib
+import threading
+import time
 import os
+import zipfile
+import subprocess
 import pytest
 from unittest.mock import patch, MagicMock
+from botocore.exceptions import ClientError
 from pathlib import Path
-from cloudrun import run
+from concurrent.futures import ThreadPoolExecutor
+from cloudrun import run, run_many, wait_for_task_completion, create_and_upload_zip, _iter_files, _list_git_files, _parse_script_path, _TaskBatcher, TaskStartError
 
 @pytest.fixture
 def mock_aws():
@@ -30,6 +39,16 @@ def mock_aws():
         mock_boto.side_effect = get_client
         yield {'s3': mock_s3, 'ecs': mock_ecs}
 
+@pytest.fixture
+def mock_ecs():
+    """Mock ECS client whose RunTask starts every requested task"""
+    mock_ecs = MagicMock()
+    mock_ecs.run_task.side_effect = lambda **kwargs: {
+        'tasks': [{'taskArn': f"arn:aws:ecs:region:account:task/cluster/task-{i}"} for i in range(kwargs['count'])],
+        'failures': []
+    }
+    return mock_ecs
+
 @pytest.fixture
 def temp_script():
     """Create a temporary script file"""
@@ -122,18 +141,378 @@ def test_task_networking(mock_aws, temp_script):
     assert task_params['networkConfiguration']['awsvpcConfiguration']['subnets'] == ['subnet-123']
     assert task_params['networkConfiguration']['awsvpcConfiguration']['assignPublicIp'] == 'ENABLED'
 
-def test_file_packaging(mock_aws, temp_script):
+def test_file_packaging(tmp_path, monkeypatch):
     """Test that files are properly packaged and uploaded to S3"""
-    job_id = run(str(temp_script))
-    
-    # Verify S3 upload was called
-    mock_aws['s3'].upload_file.assert_called_once()
-    
-    # Verify the uploaded file path and key
-    args = mock_aws['s3'].upload_file.call_args[0]  # Positional arguments
-    assert len(args) == 3  # Should have filename, bucket, and key
-    assert args[1] == 'test-bucket'  # Second argument is bucket name
-    assert 'jobs/test_script.py/temp.zip' in args[2]  # Third argument is the key
-    
-    # Verify temp file cleanup
-    assert not Path('temp.zip').exists() 
\ No newline at end of file
+    (tmp_path / 'test_script.py').write_text('def main():\n    print("test")\n')
+    monkeypatch.chdir(tmp_path)
+    mock_s3 = MagicMock()
+    mock_s3.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_s3), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'), \
+         patch('cloudrun.run_ecs_task', return_value='task-id') as mock_run_ecs_task:
+        job_id = run('test_script.main', vpc_id='vpc-123', subnet_id='subnet-123')
+
+    # Verify the archive was uploaded under its content key and handed to the task
+    assert job_id == 'task-id'
+    put_kwargs = mock_s3.put_object.call_args[1]
+    assert put_kwargs['Bucket'] == 'test-bucket'
+    assert put_kwargs['Key'].startswith('jobs/') and put_kwargs['Key'].endswith('.zip')
+    assert mock_run_ecs_task.call_args[0][2] == put_kwargs['Key']
+
+    # Verify nothing was left on disk
+    assert not Path('temp.zip').exists() 
+
+def test_iter_files_prunes_excluded_directories(tmp_path):
+    """Test that excluded directories are skipped and arcnames are relative"""
+    (tmp_path / 'pkg' / '__pycache__').mkdir(parents=True)
+    (tmp_path / '.venv' / 'lib').mkdir(parents=True)
+    (tmp_path / 'main.py').write_text('print("main")')
+    (tmp_path / 'pkg' / 'util.py').write_text('print("util")')
+    (tmp_path / 'pkg' / '__pycache__' / 'util.cpython-311.pyc').write_bytes(b'')
+    (tmp_path / '.venv' / 'lib' / 'site.py').write_text('')
+
+    files = sorted(arcname for _, arcname in _iter_files(str(tmp_path), {'.venv/', '__pycache__/'}))
+    assert files == ['main.py', os.path.join('pkg', 'util.py')]
+
+def test_run_many_batches_identical_entries(mock_ecs, temp_script):
+    """Test that run_many uploads once and starts repeated entries with RunTask count"""
+    with patch('cloudrun.create_and_upload_zip', return_value='jobs/key.zip') as mock_upload, \
+         patch('cloudrun._infrastructure.get_client', return_value=mock_ecs), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        task_ids = run_many(['test_script.main'] * 12, vpc_id='vpc-123', subnet_id='subnet-123')
+
+    mock_upload.assert_called_once()
+    assert len(task_ids) == 12
+    assert sorted(call[1]['count'] for call in mock_ecs.run_task.call_args_list) == [2, 10]
+
+def test_run_with_count_reuses_one_zip_upload(mock_ecs, temp_script):
+    """Test that run(count=N) uploads once and starts the tasks in RunTask batches of 10"""
+    with patch('cloudrun.create_and_upload_zip', return_value='jobs/key.zip') as mock_upload, \
+         patch('cloudrun._infrastructure.get_client', return_value=mock_ecs), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        task_ids = run('test_script.main', count=23, vpc_id='vpc-123', subnet_id='subnet-123')
+
+    mock_upload.assert_called_once()
+    assert len(task_ids) == 23
+    assert sorted(call[1]['count'] for call in mock_ecs.run_task.call_args_list) == [3, 10, 10]
+
+    with pytest.raises(ValueError):
+        run('test_script.main', count=0)
+
+def test_run_with_count_validates_before_uploading(temp_script):
+    """Test that an invalid size raises ValueError before the project is uploaded"""
+    with patch('cloudrun.create_and_upload_zip') as mock_upload:
+        with pytest.raises(ValueError):
+            run('test_script.main', count=3, memory=999, vpc_id='vpc-123', subnet_id='subnet-123')
+
+    mock_upload.assert_not_called()
+
+def test_run_with_count_raises_original_error_when_nothing_started(temp_script):
+    """Test that RunTask errors are not wrapped when no task was started"""
+    mock_ecs = MagicMock()
+    mock_ecs.run_task.side_effect = ClientError({'Error': {'Code': 'ClusterNotFoundException'}}, 'RunTask')
+
+    with patch('cloudrun.create_and_upload_zip', return_value='jobs/key.zip'), \
+         patch('cloudrun._infrastructure.get_client', return_value=mock_ecs), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        with pytest.raises(ClientError):
+            run('test_script.main', count=23, vpc_id='vpc-123', subnet_id='subnet-123')
+
+def test_run_with_count_reports_tasks_started_before_a_failure(temp_script):
+    """Test that a failed RunTask batch doesn't hide the tasks other batches started"""
+    def run_task(**kwargs):
+        started = 1 if kwargs['count'] == 3 else kwargs['count']
+        return {
+            'tasks': [{'taskArn': f"arn:aws:ecs:region:account:task/cluster/task-{kwargs['count']}-{i}"} for i in range(started)],
+            'failures': [{'reason': 'RESOURCE:ENI'}] * (kwargs['count'] - started)
+        }
+    mock_ecs = MagicMock()
+    mock_ecs.run_task.side_effect = run_task
+
+    with patch('cloudrun.create_and_upload_zip', return_value='jobs/key.zip'), \
+         patch('cloudrun._infrastructure.get_client', return_value=mock_ecs), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        with pytest.raises(TaskStartError) as exc:
+            run('test_script.main', count=23, vpc_id='vpc-123', subnet_id='subnet-123')
+
+    assert len(exc.value.task_ids) == 21
+    assert mock_ecs.run_task.call_count == 3
+
+def test_create_and_upload_zip_streams_archive(tmp_path, monkeypatch):
+    """Test that the archive streamed to upload_fileobj is a complete zip of the project"""
+    (tmp_path / 'main.py').write_text('print("main")')
+    (tmp_path / '__pycache__').mkdir()
+    (tmp_path / '__pycache__' / 'main.cpython-311.pyc').write_bytes(b'')
+    monkeypatch.chdir(tmp_path)
+
+    uploaded = {}
+    mock_s3 = MagicMock()
+    mock_s3.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+    mock_s3.upload_fileobj.side_effect = lambda fileobj, bucket, key, **kwargs: uploaded.update(data=fileobj.read(), key=key)
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_s3), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'), \
+         patch('cloudrun._SINGLE_PUT_MAX_SIZE', 0):
+        s3_key = create_and_upload_zip('us-east-1')
+
+    assert s3_key == uploaded['key']
+    assert s3_key.startswith('jobs/')
+    with zipfile.ZipFile(io.BytesIO(uploaded['data'])) as zipf:
+        assert zipf.namelist() == ['main.py']
+        assert zipf.read('main.py') == b'print("main")'
+
+def test_create_and_upload_zip_puts_small_archive(tmp_path, monkeypatch):
+    """Test that a project under the multipart threshold is sent with a single PutObject"""
+    (tmp_path / 'main.py').write_text('print("main")')
+    monkeypatch.chdir(tmp_path)
+
+    mock_s3 = MagicMock()
+    mock_s3.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_s3), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        s3_key = create_and_upload_zip('us-east-1')
+
+    mock_s3.upload_fileobj.assert_not_called()
+    put_kwargs = mock_s3.put_object.call_args[1]
+    assert put_kwargs['Key'] == s3_key
+    assert put_kwargs['ContentMD5'] == base64.b64encode(hashlib.md5(put_kwargs['Body']).digest()).decode('ascii')
+    with zipfile.ZipFile(io.BytesIO(put_kwargs['Body'])) as zipf:
+        assert zipf.read('main.py') == b'print("main")'
+
+def test_create_and_upload_zip_stores_precompressed_files(tmp_path, monkeypatch):
+    """Test that already-compressed files are stored while source files are deflated"""
+    (tmp_path / 'main.py').write_text('print("main")\n' * 100)
+    (tmp_path / 'data.parquet').write_bytes(b'PAR1' * 100)
+    monkeypatch.chdir(tmp_path)
+
+    mock_s3 = MagicMock()
+    mock_s3.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_s3), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        create_and_upload_zip('us-east-1')
+
+    with zipfile.ZipFile(io.BytesIO(mock_s3.put_object.call_args[1]['Body'])) as zipf:
+        assert zipf.getinfo('main.py').compress_type == zipfile.ZIP_DEFLATED
+        assert zipf.getinfo('data.parquet').compress_type == zipfile.ZIP_STORED
+        assert zipf.read('data.parquet') == b'PAR1' * 100
+
+def test_create_and_upload_zip_rejects_lzma(tmp_path, monkeypatch):
+    """Test that a compression method the task image's unzip can't extract is rejected before uploading"""
+    (tmp_path / 'main.py').write_text('print("main")')
+    monkeypatch.chdir(tmp_path)
+
+    mock_s3 = MagicMock()
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_s3), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        with pytest.raises(ValueError):
+            create_and_upload_zip('us-east-1', compression=zipfile.ZIP_LZMA)
+
+    mock_s3.put_object.assert_not_called()
+    mock_s3.upload_fileobj.assert_not_called()
+
+def test_create_and_upload_zip_rejects_positional_options():
+    """Test that the old (region, script_path, exclude_paths, verbose) call fails instead of misbinding"""
+    with pytest.raises(TypeError):
+        create_and_upload_zip('us-east-1', 'main.py', None, True)
+
+def test_create_and_upload_zip_skips_unchanged_project(tmp_path, monkeypatch):
+    """Test that an archive already in S3 under the same content key is not uploaded again"""
+    (tmp_path / 'main.py').write_text('print("main")')
+    monkeypatch.chdir(tmp_path)
+
+    mock_s3 = MagicMock()
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_s3), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        first_key = create_and_upload_zip('us-east-1')
+        second_key = create_and_upload_zip('us-east-1')
+
+    assert first_key == second_key
+    mock_s3.upload_fileobj.assert_not_called()
+    mock_s3.put_object.assert_not_called()
+
+def test_create_and_upload_zip_key_follows_file_contents(tmp_path, monkeypatch):
+    """Test that replacing a file with a same-size one under the old mtime changes the archive key"""
+    main = tmp_path / 'main.py'
+    main.write_text('print("v1")')
+    stat = main.stat()
+    monkeypatch.chdir(tmp_path)
+
+    with patch('cloudrun._infrastructure.get_client', return_value=MagicMock()), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        first_key = create_and_upload_zip('us-east-1')
+        main.write_text('print("v2")')
+        os.utime(main, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        second_key = create_and_upload_zip('us-east-1')
+
+    assert first_key != second_key
+
+def test_task_batcher_coalesces_concurrent_submissions():
+    """Test that identical tasks submitted while a RunTask is in flight share the next call"""
+    counts = []
+    first_call_started = threading.Event()
+    release_first_call = threading.Event()
+
+    def start(count):
+        counts.append(count)
+        if len(counts) == 1:
+            first_call_started.set()
+            release_first_call.wait()
+        return [f"task-{len(counts)}-{i}" for i in range(count)]
+
+    batcher = _TaskBatcher()
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        first = executor.submit(batcher.submit, 'key', start)
+        first_call_started.wait()
+        rest = [executor.submit(batcher.submit, 'key', start) for _ in range(4)]
+        while len(batcher._queues['key']) < 4:
+            time.sleep(0.01)
+        release_first_call.set()
+        task_ids = [first.result()] + [future.result() for future in rest]
+
+    assert counts == [1, 4]
+    assert len(set(task_ids)) == 5
+
+def test_task_batcher_recovers_from_interrupted_leader():
+    """Test that a RunTask interrupted by KeyboardInterrupt doesn't leave later submissions hanging"""
+    first_call_started = threading.Event()
+    release_first_call = threading.Event()
+    results = {}
+
+    def interrupted_start(count):
+        first_call_started.set()
+        release_first_call.wait()
+        raise KeyboardInterrupt
+
+    def submit(name, start):
+        # Daemon threads, so a regression fails the test instead of hanging the run
+        def target():
+            try:
+                results[name] = batcher.submit('key', start)
+            except BaseException as e:
+                results[name] = e
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    batcher = _TaskBatcher()
+    first = submit('first', interrupted_start)
+    first_call_started.wait()
+    queued = submit('queued', lambda count: ['task-queued'] * count)
+    while len(batcher._queues['key']) < 1:
+        time.sleep(0.01)
+    release_first_call.set()
+    first.join(timeout=2)
+    queued.join(timeout=2)
+    later = submit('later', lambda count: ['task-later'] * count)
+    later.join(timeout=2)
+
+    assert isinstance(results.get('first'), KeyboardInterrupt)
+    assert results.get('queued') == 'task-queued'
+    assert results.get('later') == 'task-later'
+    assert batcher._queues == {}
+
+def test_iter_files_matches_glob_excludes(tmp_path):
+    """Test that wildcard excludes like '*.pyc' match file names within a path component"""
+    (tmp_path / 'main.py').write_text('print("main")')
+    (tmp_path / 'main.pyc').write_bytes(b'')
+    (tmp_path / 'main.pyc.txt').write_text('')
+
+    files = sorted(arcname for _, arcname in _iter_files(str(tmp_path), {'*.pyc'}))
+    assert files == ['main.py', 'main.pyc.txt']
+
+def test_run_many_accepts_per_job_options(mock_ecs, temp_script):
+    """Test that run_many groups dict jobs by their effective options"""
+    jobs = [
+        {'script_path': 'test_script.main', 'params': {'lr': 0.1}},
+        {'script_path': 'test_script.main', 'params': {'lr': 0.1}},
+        {'script_path': 'test_script.main', 'params': {'lr': 0.2}, 'vcpus': 1.0, 'memory': 2048},
+        'test_script.main'
+    ]
+
+    with patch('cloudrun.create_and_upload_zip', return_value='jobs/key.zip') as mock_upload, \
+         patch('cloudrun._infrastructure.get_client', return_value=mock_ecs), \
+         patch('cloudrun._infrastructure.get_bucket_name', return_value='test-bucket'):
+        task_ids = run_many(jobs, vpc_id='vpc-123', subnet_id='subnet-123')
+
+    mock_upload.assert_called_once()
+    assert len(task_ids) == 4
+    calls = sorted((call[1]['count'], call[1]['overrides']['cpu']) for call in mock_ecs.run_task.call_args_list)
+    assert calls == [(1, '1024'), (1, '256'), (2, '256')]
+
+def test_run_many_rejects_per_job_upload_options(temp_script):
+    """Test that options describing the shared upload can't be set per job"""
+    with pytest.raises(ValueError):
+        run_many([{'script_path': 'test_script.main', 'region': 'eu-west-1'}], vpc_id='vpc-123', subnet_id='subnet-123')
+
+def test_run_many_rejects_job_without_script_path(temp_script):
+    """Test that a dict job missing its script_path raises ValueError"""
+    with patch('cloudrun.create_and_upload_zip') as mock_upload:
+        with pytest.raises(ValueError) as exc:
+            run_many([{'params': {'lr': 0.1}}], vpc_id='vpc-123', subnet_id='subnet-123')
+
+    assert 'script_path' in str(exc.value)
+    mock_upload.assert_not_called()
+
+def test_run_many_rejects_per_job_count(temp_script):
+    """Test that count can't be set on a single job"""
+    with patch('cloudrun.create_and_upload_zip') as mock_upload:
+        with pytest.raises(ValueError) as exc:
+            run_many([{'script_path': 'test_script.main', 'count': 3}], vpc_id='vpc-123', subnet_id='subnet-123')
+
+    assert 'count' in str(exc.value)
+    mock_upload.assert_not_called()
+
+def test_run_many_rejects_run_local(temp_script):
+    """Test that run_local=True fails instead of starting Fargate tasks"""
+    with patch('cloudrun.create_and_upload_zip') as mock_upload, \
+         patch('cloudrun.run_ecs_tasks') as mock_run_ecs_tasks:
+        with pytest.raises(ValueError):
+            run_many(['test_script.main'], run_local=True, vpc_id='vpc-123', subnet_id='subnet-123')
+
+    mock_upload.assert_not_called()
+    mock_run_ecs_tasks.assert_not_called()
+
+def test_list_git_files_skips_gitignored_files(tmp_path, monkeypatch):
+    """Test that the git file list leaves out ignored and deleted files"""
+    subprocess.run(['git', 'init', '-q', str(tmp_path)], check=True)
+    (tmp_path / '.gitignore').write_text('node_modules/\n')
+    (tmp_path / 'node_modules').mkdir()
+    (tmp_path / 'node_modules' / 'dep.js').write_text('')
+    (tmp_path / 'main.py').write_text('print("main")')
+    (tmp_path / 'old.py').write_text('')
+    subprocess.run(['git', '-C', str(tmp_path), 'add', 'main.py', 'old.py'], check=True)
+    (tmp_path / 'old.py').unlink()
+    monkeypatch.chdir(tmp_path)
+
+    files = sorted(arcname for _, arcname in _list_git_files({'.git/'}))
+    assert files == ['.gitignore', 'main.py']
+
+def test_parse_script_path_rejects_file_paths(temp_script):
+    """Test that a .py file path is rejected instead of parsed as a method named 'py'"""
+    assert _parse_script_path('test_script.main') == ('test_script.py', 'main')
+    with pytest.raises(ValueError):
+        _parse_script_path('./test_script.py')
+    with pytest.raises(ValueError):
+        _parse_script_path('test_script')
+
+def test_wait_for_task_completion_backs_off_until_all_tasks_stop():
+    """Test that several tasks are polled together with a growing delay"""
+    def task(task_id, status):
+        return {'taskArn': f"arn:aws:ecs:region:account:task/cluster/{task_id}", 'lastStatus': status, 'stopCode': 'EssentialContainerExited'}
+
+    mock_ecs = MagicMock()
+    mock_ecs.describe_tasks.side_effect = [
+        {'tasks': [task('a', 'RUNNING'), task('b', 'RUNNING')], 'failures': []},
+        {'tasks': [task('a', 'STOPPED'), task('b', 'RUNNING')], 'failures': []},
+        {'tasks': [task('b', 'STOPPED')], 'failures': []}
+    ]
+
+    with patch('cloudrun._infrastructure.get_client', return_value=mock_ecs), \
+         patch('cloudrun.time.sleep') as mock_sleep:
+        wait_for_task_completion(['a', 'b'], poll_interval=10)
+
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [1, 2]
+    assert mock_ecs.describe_tasks.call_args_list[-1][1]['tasks'] == ['b']